@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals
+        from .middleware import install_query_timer
+
+        signals.connect()
+        connection_created.connect(install_query_timer, dispatch_uid='request-metrics-query-timer')
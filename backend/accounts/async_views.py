@@ -0,0 +1,164 @@
+"""Async (ASGI) read path of the API.
+
+When the app is served by ``backend/asgi.py`` (uvicorn), ``ASYNC_READ_VIEWS`` is on and
+``accounts/urls.py`` swaps the list and retrieve views of every router resource, ``health/``
+and ``auth/user/`` for the coroutines below, which read through Django's async ORM. A worker
+then keeps many reads in flight on one event loop instead of one per thread.
+
+Only the plain reads the frontend repeats take the async path: ``GET`` by a signed-in user
+(session or bearer token), without a query string, asking for JSON. They produce the same body, ``ETag``,
+``X-Sync-Cursor`` and response-cache entries as ``ConditionalListMixin`` and DRF's
+``retrieve``. Everything else (filters, ``?since=``, pagination, the browsable API, writes)
+is handed to the regular DRF view in a thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, JsonResponse
+from django.urls import URLPattern, URLResolver
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from .auth_views import user_payload
+from .authentication import SignedTokenAuthentication
+from .mixins import etag_matches
+from .renderers import ORJSONRenderer
+from .response_cache import aget_response_data, aset_response_data
+from .sync import make_cursor
+from .versioning import aget_versions, make_etag
+from .views import HEALTH
+
+renderer = ORJSONRenderer()
+
+
+async def health(request):
+    return JsonResponse(HEALTH)
+
+
+@require_http_methods(["GET"])
+async def current_user(request):
+    user = await request.auser()
+    if user.is_authenticated:
+        return JsonResponse(user_payload(user))
+    return JsonResponse({'error': 'Not authenticated'}, status=401)
+
+
+def _wants_json(request):
+    """True when DRF's content negotiation would pick the compact JSON renderer."""
+    accept = request.headers.get('Accept', '')
+    if 'text/html' in accept or 'indent=' in accept:
+        return False
+    return not accept or 'application/json' in accept or '*/*' in accept
+
+
+def _viewset(sync_view, request, action, kwargs):
+    """The viewset instance DRF would dispatch ``request`` to, set up the same way."""
+    view = sync_view.cls(**sync_view.initkwargs)
+    view.action_map = sync_view.actions
+    for method, name in sync_view.actions.items():
+        setattr(view, method, getattr(view, name))
+    view.request = request
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.action = action
+    view.headers = {}
+    return view
+
+
+@sync_to_async
+def _serialize(view, data, **kwargs):
+    # Serializers may still follow relations lazily (e.g. habit completions on retrieve)
+    return view.get_serializer(data, **kwargs).data
+
+
+def _render(view, data, status=200):
+    response = HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+    for name, value in view.default_response_headers.items():
+        response[name] = value
+    return response
+
+
+async def _list(view, request):
+    cursor = make_cursor()
+    etag = make_etag(request.user, await aget_versions(request.user, [view.collection]), request)
+    if etag_matches(request, etag):
+        response = _render(view, None, status=304)
+        del response['Content-Type']
+        response.content = b''
+    else:
+        data = await aget_response_data(view.collection, etag)
+        if data is None:
+            queryset = view.filter_queryset(view.get_queryset())
+            if view.values_serializer_class:
+                data = await view.get_serializer(queryset, many=True).adata()
+            else:
+                data = await _serialize(view, [obj async for obj in queryset], many=True)
+            await aset_response_data(etag, data)
+        response = _render(view, data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Sync-Cursor'] = cursor
+    return response
+
+
+async def _retrieve(view):
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup = {view.lookup_field: view.kwargs[view.lookup_url_kwarg or view.lookup_field]}
+    # Same 404 bodies as DRF's get_object_or_404
+    try:
+        instance = await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        return _render(view, {'detail': f'No {queryset.model._meta.object_name} matches the given query.'}, status=404)
+    except (TypeError, ValueError, ValidationError):
+        return _render(view, {'detail': 'Not found.'}, status=404)
+    return _render(view, await _serialize(view, instance))
+
+
+def async_read_view(sync_view):
+    """Async front for the list or retrieve route of a DRF viewset (``sync_view``)."""
+    action = sync_view.actions['get']
+    run_sync = sync_to_async(sync_view)
+
+    @functools.wraps(sync_view)
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET' or request.GET or 'format' in kwargs or not _wants_json(request):
+            return await run_sync(request, *args, **kwargs)
+        try:
+            # Bearer tokens are checked without a query, so that needs no thread
+            token = SignedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return await run_sync(request, *args, **kwargs)
+        user, auth = token or (await request.auser(), None)
+        if not user.is_authenticated:
+            return await run_sync(request, *args, **kwargs)
+
+        drf_request = Request(request)
+        drf_request.user, drf_request.auth = user, auth
+        viewset = _viewset(sync_view, drf_request, action, kwargs)
+        if action == 'list':
+            return await _list(viewset, drf_request)
+        return await _retrieve(viewset)
+
+    return view
+
+
+ASYNC_VIEWS = {'api-health': health, 'current-user': current_user}
+
+
+def async_urlpatterns(patterns):
+    """``patterns`` with the views above swapped in for the routes they serve."""
+    swapped = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern, async_urlpatterns(pattern.url_patterns),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace,
+            )
+        elif pattern.name in ASYNC_VIEWS:
+            pattern = URLPattern(pattern.pattern, ASYNC_VIEWS[pattern.name], pattern.default_args, pattern.name)
+        elif getattr(pattern.callback, 'actions', {}).get('get') in ('list', 'retrieve'):
+            pattern = URLPattern(pattern.pattern, async_read_view(pattern.callback), pattern.default_args, pattern.name)
+        swapped.append(pattern)
+    return swapped
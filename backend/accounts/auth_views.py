@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from django.core import signing
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
 
+from .authentication import issue_tokens, refresh_token_user
+
 
 @csrf_exempt
 @require_http_methods(["POST", "OPTIONS"])
@@ -32,7 +36,8 @@ def register(request):
             first_name=name
         )
         
-        login(request, user)
+        # The new user was not authenticated by a backend, so name the preferred one
+        login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
         
         return JsonResponse({
             'id': user.id,
@@ -81,15 +86,63 @@ def logout_view(request):
     return JsonResponse({'message': 'Logged out successfully'})
 
 
+def user_payload(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'name': user.first_name or user.username
+    }
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def token_view(request):
+    """Signed access/refresh tokens for API clients that skip sessions (see authentication.py)."""
+    if request.method == "OPTIONS":
+        return JsonResponse({}, status=200)
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    username = data.get('username')
+    password = data.get('password')
+    if not username or not password:
+        return JsonResponse({'error': 'Username and password required'}, status=400)
+
+    user = authenticate(request, username=username, password=password)
+    if user is None:
+        return JsonResponse({'error': 'Invalid credentials'}, status=401)
+    return JsonResponse({**issue_tokens(user), 'user': user_payload(user)})
+
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+def token_refresh(request):
+    """A new token pair for a valid refresh token."""
+    if request.method == "OPTIONS":
+        return JsonResponse({}, status=200)
+    data = _json_body(request)
+    if data is None or not isinstance(data.get('refresh'), str):
+        return JsonResponse({'error': 'Refresh token required'}, status=400)
+    try:
+        user = refresh_token_user(data['refresh'])
+    except signing.BadSignature:
+        return JsonResponse({'error': 'Invalid or expired refresh token'}, status=401)
+    return JsonResponse({**issue_tokens(user), 'user': user_payload(user)})
+
+
 @require_http_methods(["GET"])
 def current_user(request):
     if request.user.is_authenticated:
-        return JsonResponse({
-            'id': request.user.id,
-            'username': request.user.username,
-            'email': request.user.email,
-            'name': request.user.first_name or request.user.username
-        })
+        return JsonResponse(user_payload(request.user))
     return JsonResponse({'error': 'Not authenticated'}, status=401)
 
 
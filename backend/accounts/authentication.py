@@ -0,0 +1,91 @@
+"""Signed, stateless access and refresh tokens, an alternative to session cookies.
+
+``POST /api/auth/token/`` trades a username and password for a pair of tokens. Both are
+``django.core.signing`` strings (JSON claims and a timestamp, HMAC-signed with SECRET_KEY),
+so any server sharing SECRET_KEY accepts them without a shared session store.
+
+An access token carries what the API needs to know about its user (id, username, name,
+email and ``date_joined``, which ETags use). ``SignedTokenAuthentication`` checks it without a query and without CSRF, since a
+browser never sends an ``Authorization`` header on its own. It cannot be revoked: it stays
+valid for ``ACCESS_TOKEN_LIFETIME`` seconds, even after a password change. The refresh token
+(``REFRESH_TOKEN_LIFETIME``) is traded for a new pair at ``/api/auth/token/refresh/``; that
+reads the user once and fails when the account was deactivated or its password changed.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.db import router
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+ACCESS_SALT = 'accounts.authentication.access'
+REFRESH_SALT = 'accounts.authentication.refresh'
+# User fields an access token carries, in model field order as Model.from_db() expects them
+ACCESS_FIELDS = ('id', 'username', 'first_name', 'email', 'date_joined')
+
+
+def _password_tag(user):
+    """Changes with the password, so a password change ends the user's refresh tokens."""
+    return salted_hmac(REFRESH_SALT, user.get_session_auth_hash()).hexdigest()[:20]
+
+
+def issue_tokens(user):
+    return {
+        'token_type': 'Bearer',
+        'access': signing.dumps(
+            [user.pk, user.username, user.first_name, user.email, user.date_joined.isoformat()], salt=ACCESS_SALT,
+        ),
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+        'refresh': signing.dumps([user.pk, _password_tag(user)], salt=REFRESH_SALT),
+    }
+
+
+def access_token_user(token):
+    """The user an access token was issued to, built from its claims without a query.
+
+    Other user fields are deferred and load on first access. Raises ``signing.BadSignature``
+    (``SignatureExpired`` once it is too old) for tokens this server did not issue.
+    """
+    values = signing.loads(token, salt=ACCESS_SALT, max_age=settings.ACCESS_TOKEN_LIFETIME)
+    if not isinstance(values, list) or len(values) != len(ACCESS_FIELDS):
+        raise signing.BadSignature('Malformed token')
+    values[-1] = datetime.fromisoformat(values[-1])
+    return User.from_db(router.db_for_read(User), ACCESS_FIELDS, values)
+
+
+def refresh_token_user(token):
+    """The active user a refresh token was issued to, if their password is unchanged."""
+    values = signing.loads(token, salt=REFRESH_SALT, max_age=settings.REFRESH_TOKEN_LIFETIME)
+    if not isinstance(values, list) or len(values) != 2:
+        raise signing.BadSignature('Malformed token')
+    user_id, tag = values
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or not constant_time_compare(tag, _password_tag(user)):
+        raise signing.BadSignature('Token no longer valid')
+    return user
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """``Authorization: Bearer <access token>``; requests without it fall through to the session."""
+
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        try:
+            token = header[1].decode()
+            return access_token_user(token), token
+        except signing.SignatureExpired:
+            raise AuthenticationFailed('Token expired.')
+        except (signing.BadSignature, UnicodeError, TypeError, ValueError):
+            raise AuthenticationFailed('Invalid token.')
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
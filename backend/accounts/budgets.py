@@ -0,0 +1,108 @@
+"""Monthly per-category spending totals (``BudgetRollup``) behind ``budget-status``.
+
+Every expense write adjusts the rollups inside its own transaction:
+
+* single saves and deletes through the signals in accounts/signals.py;
+* deletes of expense querysets in ``ExpenseQuerySet.delete``;
+* bulk writes (the bulk endpoint, statement import, recurring expenses, demo data), which
+  skip signals, by calling ``apply_rollups`` themselves.
+
+Changes are applied as increments in one ``INSERT ... ON CONFLICT DO UPDATE``, so concurrent
+writers add up instead of overwriting each other. Deleting a category or a user removes its
+rollups by cascade. ``python manage.py rebuild_budget_rollups`` recomputes them from scratch.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connections, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import BudgetRollup, Expense
+
+# Rows per upsert statement; 6 parameters each stays under SQLite's 999 limit
+UPSERT_BATCH = 150
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _deltas(added=(), removed=()):
+    """Sum ``Expense.rollup_state()`` tuples into ``{(user, category, month): [spent, income, count]}``."""
+    deltas = defaultdict(lambda: [Decimal('0.00'), Decimal('0.00'), 0])
+    for states, sign in ((added, 1), (removed, -1)):
+        for user_id, category_id, day, amount in states:
+            delta = deltas[(user_id, category_id, month_start(day))]
+            amount = Decimal(amount)
+            if amount < 0:
+                delta[0] -= sign * amount
+            else:
+                delta[1] += sign * amount
+            delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def _upsert(deltas, using='default'):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(BudgetRollup._meta.db_table)
+    spent, income, count = quote('spent'), quote('income'), quote('count')
+    rows = [(*key, *delta) for key, delta in deltas.items()]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH):
+            batch = rows[start:start + UPSERT_BATCH]
+            cursor.execute(
+                f"INSERT INTO {table} (user_id, category_id, month, {spent}, {income}, {count}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT (category_id, month) DO UPDATE SET "
+                f"{spent} = {table}.{spent} + excluded.{spent}, "
+                f"{income} = {table}.{income} + excluded.{income}, "
+                f"{count} = {table}.{count} + excluded.{count}",
+                [value for row in batch for value in row],
+            )
+
+
+def apply_rollups(added=(), removed=(), using='default'):
+    """Count the ``added`` expense states in, and the ``removed`` ones out of, their months."""
+    deltas = _deltas(added, removed)
+    if deltas:
+        _upsert(deltas, using)
+
+
+def _totals(queryset):
+    """One GROUP BY over ``queryset``: ``{(user, category, month): [spent, income, count]}``."""
+    rows = (
+        queryset.order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'category_id', 'month')
+        .annotate(
+            spend_total=Sum('amount', filter=Q(amount__lt=0)),
+            income_total=Sum('amount', filter=Q(amount__gte=0)),
+            rows=Count('id'),
+        )
+    )
+    return {
+        (row['user_id'], row['category_id'], row['month']):
+            [-(row['spend_total'] or 0), row['income_total'] or 0, row['rows']]
+        for row in rows
+    }
+
+
+def remove_expenses(queryset):
+    """Take the rows of an expense queryset that is about to be deleted out of the rollups."""
+    deltas = {key: [-value for value in totals] for key, totals in _totals(queryset).items()}
+    if deltas:
+        _upsert(deltas, queryset.db)
+
+
+def rebuild_rollups(user=None):
+    """Recompute the rollups of ``user`` (or of everyone) from the expense table."""
+    expenses = Expense.objects.all() if user is None else Expense.objects.filter(user=user)
+    rollups = BudgetRollup.objects.all() if user is None else BudgetRollup.objects.filter(user=user)
+    with transaction.atomic():
+        rollups.delete()
+        BudgetRollup.objects.bulk_create([
+            BudgetRollup(user_id=user_id, category_id=category_id, month=month, spent=spent, income=income, count=count)
+            for (user_id, category_id, month), (spent, income, count) in _totals(expenses).items()
+        ], batch_size=1000)
@@ -0,0 +1,95 @@
+"""gzip/brotli encoding of API responses (see ``CompressionMiddleware``).
+
+Brotli is used when the ``brotli`` package is installed and the client accepts it, gzip
+otherwise. Bodies under ``COMPRESSION_MIN_BYTES`` are sent as they are: for those the
+header overhead and CPU time outweigh the bytes saved.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'text/', 'image/svg+xml',
+)
+
+
+def accepted_encodings(header):
+    """Content codings an ``Accept-Encoding`` header allows (``q=0`` excluded)."""
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    if '*' in accepted:
+        accepted.update(('br', 'gzip'))
+    return accepted
+
+
+def choose_encoding(accept_encoding):
+    """``'br'``, ``'gzip'`` or None for an ``Accept-Encoding`` header."""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def is_compressible(content_type):
+    return content_type.split(';')[0].strip().lower().startswith(COMPRESSIBLE_TYPES)
+
+
+class Compressor:
+    """Incremental encoder for one response body."""
+
+    def __init__(self, encoding, brotli_quality=4, gzip_level=6):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress, self._flush, self._finish = (
+                self._compressor.process, self._compressor.flush, self._compressor.finish,
+            )
+        else:
+            # wbits 16+: gzip container, as Content-Encoding: gzip requires
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def compress(self, data):
+        """Whole-body encoding."""
+        return self._compress(data) + self._finish()
+
+    def compress_chunk(self, chunk):
+        """Encode one streamed chunk, flushed so clients see it without waiting for the end."""
+        return self._compress(chunk) + self._flush()
+
+    def finish(self):
+        return self._finish()
+
+
+def compress_stream(chunks, compressor):
+    for chunk in chunks:
+        data = compressor.compress_chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, compressor):
+    async for chunk in chunks:
+        data = compressor.compress_chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
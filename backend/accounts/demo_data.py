@@ -0,0 +1,134 @@
+"""Synthetic dataset generator used by the seed_demo_data command and the performance tests."""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from .models import (
+    Achievement,
+    Expense,
+    FinanceCategory,
+    Habit,
+    HabitCompletion,
+    Note,
+    Quadrant,
+    QuadrantTask,
+    Task,
+    TaskCategory,
+    Thought,
+    compute_streak_stats,
+)
+from .budgets import apply_rollups
+from .versioning import COLLECTIONS, mark_changed
+
+BATCH_SIZE = 1000
+
+HABIT_NAMES = ['Morning run', 'Read 20 pages', 'Meditate', 'Drink water', 'Journal', 'Stretch', 'No sugar', 'Practice guitar']
+FINANCE_CATEGORIES = [
+    ('Food', '#ff6b6b', 600), ('Rent', '#4dabf7', 1500), ('Transport', '#ffd43b', 200),
+    ('Shopping', '#da77f2', 300), ('Bills', '#69db7c', 250), ('Fun', '#ffa94d', 150),
+    ('Health', '#38d9a9', 100), ('Salary', '#51cf66', 0),
+]
+TASK_CATEGORIES = [('Work', '#4dabf7'), ('Home', '#69db7c'), ('Errands', '#ffd43b'), ('Study', '#da77f2'), ('Health', '#38d9a9')]
+QUADRANTS = [choice for choice, _ in QuadrantTask.QUADRANT_CHOICES]
+THOUGHT_CATEGORIES = [choice for choice, _ in Thought.CATEGORY_CHOICES]
+WORDS = (
+    'plan review call email budget meeting groceries gym report draft fix deploy refactor '
+    'book doctor laundry invoice backup garden lesson chapter sprint design'
+).split()
+
+
+def _sentence(rng, words=6):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def seed_user(user, *, years=2, expenses_per_day=3, notes=200, tasks=300, quadrant_tasks=100,
+              thoughts=20, achievements=150, rng=None):
+    """Create a realistic, multi-year history for ``user`` using batched bulk inserts.
+
+    Returns a dict with the number of rows created per model.
+    """
+    rng = rng or random.Random()
+    today = timezone.localdate()
+    first_day = today - timedelta(days=365 * years)
+    days = [first_day + timedelta(days=offset) for offset in range((today - first_day).days + 1)]
+    counts = {}
+
+    habits = Habit.objects.bulk_create([
+        Habit(user=user, name=name, frequency=1, paused=rng.random() < 0.1) for name in HABIT_NAMES
+    ])
+    completions = []
+    for habit in habits:
+        rate = rng.uniform(0.4, 0.9)
+        dates = [day for day in days if rng.random() < rate]
+        completions += [HabitCompletion(habit=habit, date=day) for day in dates]
+        for field, value in compute_streak_stats(dates).items():
+            setattr(habit, field, value)
+    HabitCompletion.objects.bulk_create(completions, batch_size=BATCH_SIZE)
+    Habit.objects.bulk_update(habits, Habit.STATS_FIELDS)
+    counts['habits'], counts['habit_completions'] = len(habits), len(completions)
+
+    finance_categories = FinanceCategory.objects.bulk_create([
+        FinanceCategory(user=user, name=name, color=color, budget=budget) for name, color, budget in FINANCE_CATEGORIES
+    ])
+    spending, salary = finance_categories[:-1], finance_categories[-1]
+    expenses = []
+    for day in days:
+        for _ in range(rng.randint(0, expenses_per_day * 2)):
+            category = rng.choice(spending)
+            expenses.append(Expense(
+                user=user, title=_sentence(rng, 2), amount=-Decimal(rng.randint(100, 20000)) / 100,
+                date=day, description=_sentence(rng), category=category,
+                is_recurring=category.name in ('Rent', 'Bills'),
+            ))
+        if day.day == 1:
+            expenses.append(Expense(user=user, title='Salary', amount=Decimal(rng.randint(300000, 500000)) / 100,
+                                    date=day, category=salary, is_recurring=True))
+    Expense.objects.bulk_create(expenses, batch_size=BATCH_SIZE)
+    apply_rollups(added=[expense.rollup_state() for expense in expenses])
+    counts['finance_categories'], counts['expenses'] = len(finance_categories), len(expenses)
+
+    task_categories = TaskCategory.objects.bulk_create([
+        TaskCategory(user=user, name=name, color=color) for name, color in TASK_CATEGORIES
+    ])
+    Task.objects.bulk_create([
+        Task(user=user, category=rng.choice(task_categories), title=_sentence(rng, 4),
+             description=_sentence(rng, 12), completed=rng.random() < 0.6)
+        for _ in range(tasks)
+    ], batch_size=BATCH_SIZE)
+    counts['task_categories'], counts['tasks'] = len(task_categories), tasks
+
+    Note.objects.bulk_create([
+        Note(user=user, title=_sentence(rng, 3), content='\n'.join(_sentence(rng, 12) for _ in range(5)),
+             category=rng.choice(['Work', 'Personal', 'Ideas', '']), pinned=rng.random() < 0.05)
+        for _ in range(notes)
+    ], batch_size=BATCH_SIZE)
+    counts['notes'] = notes
+
+    Quadrant.objects.bulk_create([
+        Quadrant(user=user, name=label, description=_sentence(rng)) for _, label in QuadrantTask.QUADRANT_CHOICES
+    ])
+    QuadrantTask.objects.bulk_create([
+        QuadrantTask(user=user, quadrant=rng.choice(QUADRANTS), text=_sentence(rng, 4),
+                     deadline=rng.choice(days) if rng.random() < 0.5 else None, completed=rng.random() < 0.5)
+        for _ in range(quadrant_tasks)
+    ], batch_size=BATCH_SIZE)
+    counts['quadrant_tasks'] = quadrant_tasks
+
+    Thought.objects.bulk_create([
+        Thought(user=user, category=rng.choice(THOUGHT_CATEGORIES), text=_sentence(rng, 10), is_active=rng.random() < 0.8)
+        for _ in range(thoughts)
+    ])
+    counts['thoughts'] = thoughts
+
+    Achievement.objects.bulk_create([
+        Achievement(user=user, title=_sentence(rng, 3), description=_sentence(rng, 10), date_earned=rng.choice(days),
+                    category=rng.choice(['Fitness', 'Learning', 'Career', '']))
+        for _ in range(achievements)
+    ], batch_size=BATCH_SIZE)
+    counts['achievements'] = achievements
+
+    # bulk_create skips the signals that keep list ETags and cached responses current
+    mark_changed(user.id, *COLLECTIONS)
+    return counts
@@ -0,0 +1,126 @@
+"""Streaming account export.
+
+Rows are read with ``values().iterator(chunk_size=...)`` and encoded one at a time, so
+memory use does not depend on how much data the user has.
+"""
+import csv
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+
+from .models import (
+    Achievement,
+    Expense,
+    FinanceCategory,
+    Habit,
+    HabitCompletion,
+    Note,
+    QuadrantTask,
+    Task,
+    TaskCategory,
+    Thought,
+)
+
+CHUNK_SIZE = 2000
+# Lines are joined into blocks of about this many characters before being sent
+BLOCK_SIZE = 64 * 1024
+
+# (record type, queryset factory, exported columns); rows are filtered by owner
+EXPORTS = [
+    ('habit', lambda user: Habit.objects.filter(user=user),
+     ['id', 'name', 'frequency', 'paused', 'created_at', 'current_streak', 'longest_streak', 'total_completions']),
+    ('habit_completion', lambda user: HabitCompletion.objects.filter(habit__user=user),
+     ['habit_id', 'date']),
+    ('finance_category', lambda user: FinanceCategory.objects.filter(user=user),
+     ['id', 'name', 'color', 'budget']),
+    ('expense', lambda user: Expense.objects.filter(user=user),
+     ['id', 'date', 'time', 'title', 'amount', 'category_id', 'category__name', 'description', 'is_recurring',
+      'recurrence', 'recurrence_interval', 'recurrence_until', 'recurrence_source_id']),
+    ('task_category', lambda user: TaskCategory.objects.filter(user=user),
+     ['id', 'name', 'color']),
+    ('task', lambda user: Task.objects.filter(user=user),
+     ['id', 'category_id', 'title', 'description', 'completed', 'created_at']),
+    ('note', lambda user: Note.objects.filter(user=user),
+     ['id', 'title', 'content', 'category', 'color', 'pinned', 'created_at', 'updated_at']),
+    ('quadrant_task', lambda user: QuadrantTask.objects.filter(user=user),
+     ['id', 'quadrant', 'text', 'deadline', 'time', 'completed', 'created_at']),
+    ('thought', lambda user: Thought.objects.filter(user=user),
+     ['id', 'category', 'text', 'is_active', 'created_at', 'updated_at']),
+    ('achievement', lambda user: Achievement.objects.filter(user=user),
+     ['id', 'title', 'description', 'category', 'date_earned', 'created_at']),
+]
+
+
+def _column_name(field):
+    return field.replace('__', '_')
+
+
+def _encode(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def iter_rows(user):
+    """Yield ``(record type, columns, row tuple)`` for every exported row of ``user``."""
+    for record_type, queryset, fields in EXPORTS:
+        rows = queryset(user).order_by('pk').values_list(*fields)
+        columns = [_column_name(field) for field in fields]
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield record_type, columns, row
+
+
+def ndjson_lines(user):
+    """One JSON object per line, tagged with its ``type``."""
+    for record_type, columns, row in iter_rows(user):
+        record = {'type': record_type}
+        record.update(zip(columns, map(_encode, row)))
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each formatted line."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(user):
+    """One CSV section per record type: a ``type,<columns>`` header row, then its rows."""
+    writer = csv.writer(_Line())
+    current = None
+    for record_type, columns, row in iter_rows(user):
+        if record_type != current:
+            if current is not None:
+                yield '\r\n'
+            yield writer.writerow(['type', *columns])
+            current = record_type
+        yield writer.writerow([record_type, *map(_encode, row)])
+
+
+def blocks(lines, size=BLOCK_SIZE):
+    """Join small lines into larger blocks so the server does not flush once per row."""
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def ablocks(blocks):
+    """Async iterator over ``blocks`` for ASGI servers, which buffer a sync stream whole.
+
+    Each block is produced in Django's sync thread, so the queries stay on one connection.
+    """
+    iterator = iter(blocks)
+    take = sync_to_async(next, thread_sensitive=True)
+    while (block := await take(iterator, None)) is not None:
+        yield block
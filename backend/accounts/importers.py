@@ -0,0 +1,316 @@
+"""Streaming CSV/OFX bank statement import into ``Expense`` rows.
+
+The upload is parsed row by row and written in batches: each batch is deduplicated
+against the user's existing ``(date, amount, title)`` rows with one query and inserted
+with one ``bulk_create``, and the ``ExpenseImport`` job row is updated with progress.
+"""
+import csv
+import io
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .budgets import apply_rollups
+from .models import Expense, ExpenseImport, FinanceCategory
+from .versioning import mark_changed
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+READ_SIZE = 64 * 1024
+DEFAULT_CATEGORY = 'Uncategorized'
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%d.%m.%Y')
+
+# Accepted CSV header names (lower-cased), in order of preference
+CSV_COLUMNS = {
+    'date': ('date', 'transaction date', 'booking date', 'posted', 'value date'),
+    'amount': ('amount', 'value', 'sum'),
+    'debit': ('debit', 'withdrawal', 'paid out'),
+    'credit': ('credit', 'deposit', 'paid in'),
+    'title': ('title', 'payee', 'name', 'merchant', 'description', 'details'),
+    'description': ('memo', 'notes', 'reference', 'description'),
+    'category': ('category',),
+}
+OFX_TAG_RE = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+class RowError(ValueError):
+    pass
+
+
+def parse_amount(raw):
+    """Parse "1,234.50", "1.234,50", "-12,5", "(15.00)" or "$ 9.99" into a Decimal with 2 places."""
+    text = re.sub(r'[^\d,.\-()+]', '', str(raw or ''))
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    if ',' in text and '.' in text:
+        # The last separator is the decimal mark: "1,234.50" or "1.234,50"
+        grouping = ',' if text.rfind('.') > text.rfind(',') else '.'
+        text = text.replace(grouping, '').replace(',', '.')
+    elif text.count(',') > 1 or text.count('.') > 1:
+        # Only grouping separators: "1,234,567" or "1.234.567"
+        text = text.replace(',', '').replace('.', '')
+    else:
+        # A single comma is a decimal mark ("12,5"); three digits after it are checked below
+        text = text.replace(',', '.')
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise RowError(f"invalid amount {raw!r}")
+    if amount.as_tuple().exponent < -2:
+        # "1.234" and "1,234" are 1234 in some locales and 1.234 in others; rounding either way loses money
+        raise RowError(f"ambiguous amount {raw!r}")
+    return (-amount if negative else amount).quantize(Decimal('0.01'))
+
+
+def parse_day(raw, date_format=None):
+    raw = (raw or '').strip()
+    for pattern in ([date_format] if date_format else DATE_FORMATS):
+        try:
+            return datetime.strptime(raw, pattern).date()
+        except ValueError:
+            continue
+    raise RowError(f"invalid date {raw!r}")
+
+
+def _csv_mapping(header):
+    """Map our column names to positions in ``header``."""
+    names = [name.strip().lower() for name in header]
+    mapping = {}
+    for column, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in names and names.index(alias) not in mapping.values():
+                mapping[column] = names.index(alias)
+                break
+    if 'date' not in mapping or not ('amount' in mapping or 'debit' in mapping or 'credit' in mapping):
+        raise RowError("CSV needs a date column and an amount (or debit/credit) column")
+    return mapping
+
+
+def parse_csv(text, date_format=None):
+    """Yield ``(row number, fields or None, error or None)`` for each data row."""
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        raise RowError("file is empty")
+    mapping = _csv_mapping(header)
+
+    def cell(row, column):
+        index = mapping.get(column)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    for number, row in enumerate(reader, start=2):
+        if not any(value.strip() for value in row):
+            continue
+        try:
+            if cell(row, 'amount'):
+                amount = parse_amount(cell(row, 'amount'))
+            else:
+                # Separate debit/credit columns: money out is spending (negative)
+                amount = (parse_amount(cell(row, 'credit')) if cell(row, 'credit') else Decimal('0.00')) \
+                    - (abs(parse_amount(cell(row, 'debit'))) if cell(row, 'debit') else Decimal('0.00'))
+            yield number, {
+                'date': parse_day(cell(row, 'date'), date_format),
+                'amount': amount,
+                'title': cell(row, 'title'),
+                'description': cell(row, 'description'),
+                'category': cell(row, 'category'),
+            }, None
+        except RowError as error:
+            yield number, None, str(error)
+
+
+def _ofx_tokens(text):
+    """Yield ``(closing, TAG, value)`` from OFX 1.x SGML or 2.x XML, reading in chunks."""
+    buffer = ''
+    while True:
+        chunk = text.read(READ_SIZE)
+        buffer += chunk
+        cut = len(buffer) if not chunk else buffer.rfind('<')
+        if cut <= 0 and chunk:
+            continue
+        for match in OFX_TAG_RE.finditer(buffer, 0, cut):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+        if not chunk:
+            return
+
+
+def parse_ofx(text, date_format=None):
+    """Yield ``(transaction number, fields or None, error or None)`` for each STMTTRN."""
+    number, current = 0, None
+    for closing, tag, value in _ofx_tokens(text):
+        if tag == 'STMTTRN':
+            if not closing:
+                number, current = number + 1, {}
+                continue
+            fields, current = current, None
+            try:
+                yield number, {
+                    # DTPOSTED is YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]]
+                    'date': parse_day(fields.get('DTPOSTED', '')[:8], '%Y%m%d'),
+                    'amount': parse_amount(fields.get('TRNAMT')),
+                    'title': fields.get('NAME') or fields.get('PAYEE') or fields.get('MEMO', ''),
+                    'description': fields.get('MEMO', '') if fields.get('NAME') else '',
+                    'category': '',
+                }, None
+            except RowError as error:
+                yield number, None, str(error)
+        elif current is not None and not closing and value:
+            current[tag] = value
+
+
+PARSERS = {'csv': parse_csv, 'ofx': parse_ofx}
+
+
+class StatementImporter:
+    """Resolves categories, deduplicates and inserts parsed rows for one ``ExpenseImport``."""
+
+    def __init__(self, job, rules=(), default_category=None):
+        self.job = job
+        self.user = job.user
+        self.rules = [(rule['match'].lower(), rule['category']) for rule in rules]
+        self.default_category = default_category or DEFAULT_CATEGORY
+        self.categories = {category.name.lower(): category for category in FinanceCategory.objects.filter(user=self.user)}
+        # Rows this import inserted, so they are not mistaken for pre-existing duplicates
+        self.inserted = Counter()
+
+    def category_for(self, fields):
+        name = fields['category']
+        if not name:
+            title = fields['title'].lower()
+            name = next((category for match, category in self.rules if match in title), self.default_category)
+        category = self.categories.get(name.lower())
+        if category is None:
+            category, _ = FinanceCategory.objects.get_or_create(user=self.user, name=name[:100])
+            self.categories[name.lower()] = category
+        return category
+
+    def add_error(self, number, message):
+        self.job.failed += 1
+        if len(self.job.errors) < ExpenseImport.MAX_ERRORS:
+            self.job.errors.append({'row': number, 'error': message})
+
+    def run(self, rows, position=None):
+        batch = []
+        for number, fields, error in rows:
+            self.job.rows += 1
+            if error is None:
+                fields['title'] = (fields['title'] or fields['description'])[:255]
+                if not fields['title']:
+                    error = "missing title"
+            if error is not None:
+                self.add_error(number, error)
+                continue
+            batch.append(fields)
+            if len(batch) >= BATCH_SIZE:
+                self.flush(batch, position)
+                batch = []
+        self.flush(batch, position)
+
+    def flush(self, batch, position=None):
+        with transaction.atomic():
+            if batch:
+                existing = Counter(
+                    Expense.objects.filter(user=self.user, date__in={fields['date'] for fields in batch})
+                    .values_list('date', 'amount', 'title')
+                    .order_by()
+                )
+                existing.subtract(self.inserted)
+                new = []
+                for fields in batch:
+                    key = (fields['date'], fields['amount'], fields['title'])
+                    if existing[key] > 0:
+                        existing[key] -= 1
+                        self.job.duplicates += 1
+                        continue
+                    self.inserted[key] += 1
+                    new.append(Expense(
+                        user=self.user, date=fields['date'], amount=fields['amount'], title=fields['title'],
+                        description=fields['description'], category=self.category_for(fields),
+                    ))
+                Expense.objects.bulk_create(new, batch_size=BATCH_SIZE)
+                apply_rollups(added=[expense.rollup_state() for expense in new])
+                self.job.imported += len(new)
+                if new:
+                    mark_changed(self.user.id, 'expenses')
+            if position is not None:
+                self.job.bytes_read = position()
+            self.job.save(update_fields=['rows', 'imported', 'duplicates', 'failed', 'errors', 'bytes_read', 'updated_at'])
+
+
+def run_import(job_id, path, rules=(), default_category=None, date_format=None):
+    """Import the statement stored at ``path`` into the job's user, then delete the file."""
+    job = ExpenseImport.objects.select_related('user').get(pk=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status', 'updated_at'])
+    try:
+        with open(path, 'rb') as raw:
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+            importer = StatementImporter(job, rules, default_category)
+            importer.run(PARSERS[job.format](text, date_format), position=raw.tell)
+        job.status = 'done'
+    except Exception as error:
+        logger.exception("expense import failed job=%s", job.id)
+        job.status = 'failed'
+        job.errors = (job.errors + [{'row': None, 'error': str(error)}])[-ExpenseImport.MAX_ERRORS:]
+    finally:
+        os.remove(path)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'errors', 'finished_at', 'updated_at'])
+    logger.info(
+        "expense import finished job=%s status=%s rows=%s imported=%s duplicates=%s failed=%s",
+        job.id, job.status, job.rows, job.imported, job.duplicates, job.failed,
+    )
+
+
+def _run_in_thread(*args, **kwargs):
+    close_old_connections()
+    try:
+        run_import(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def fail_stale_imports(user=None):
+    """Mark pending/running jobs that made no progress for ``EXPENSE_IMPORT_STALE_MINUTES`` as failed.
+
+    The import thread dies with its worker (a restart or deploy), leaving the job behind. Rows
+    already imported stay; uploading the file again skips them as duplicates. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.EXPENSE_IMPORT_STALE_MINUTES)
+    stale = ExpenseImport.objects.filter(status__in=('pending', 'running'), updated_at__lt=cutoff)
+    if user is not None:
+        stale = stale.filter(user=user)
+    failed = 0
+    for job in stale:
+        logger.warning("expense import interrupted job=%s status=%s rows=%s", job.id, job.status, job.rows)
+        job.status = 'failed'
+        job.errors = (job.errors + [{'row': None, 'error': "import was interrupted; upload the file again"}])[
+            -ExpenseImport.MAX_ERRORS:
+        ]
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'errors', 'finished_at', 'updated_at'])
+        failed += 1
+    return failed
+
+
+def start_import(job, path, **options):
+    """Run the import in a background thread once the job row is committed.
+
+    With ``EXPENSE_IMPORT_ASYNC = False`` (tests, management scripts) it runs inline.
+    """
+    if not settings.EXPENSE_IMPORT_ASYNC:
+        run_import(job.id, path, **options)
+        return
+    transaction.on_commit(lambda: threading.Thread(
+        target=_run_in_thread, args=(job.id, path), kwargs=options, name=f'expense-import-{job.id}', daemon=True,
+    ).start())
@@ -0,0 +1,86 @@
+import json
+import time
+
+import orjson
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.compression import Compressor, brotli
+from accounts.renderers import ORJSONRenderer
+from accounts.urls import router
+
+
+def cpu_ms(function, repeat):
+    """Average CPU time of ``function()`` in milliseconds, and its last result."""
+    started = time.process_time()
+    for _ in range(repeat):
+        result = function()
+    return (time.process_time() - started) * 1000 / repeat, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Bytes and CPU time per list response: the ModelSerializer against the values() list "
+        "serializer, DRF's JSON encoder against orjson, and the cost and size of gzip/brotli. "
+        "Seed data first, e.g. with seed_demo_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='demo1')
+        parser.add_argument('--resources', nargs='+', default=['habits', 'expenses', 'notes', 'tasks', 'achievements'])
+        parser.add_argument('--repeat', type=int, default=20, help="Runs averaged per measurement.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['username']!r}; run seed_demo_data first")
+        viewsets = {prefix: viewset for prefix, viewset, _ in router.registry}
+        unknown = set(options['resources']) - set(viewsets)
+        if unknown:
+            raise CommandError(f"Unknown resources: {', '.join(sorted(unknown))}")
+
+        repeat = options['repeat']
+        encodings = ['gzip'] if brotli is None else ['gzip', 'br']
+        levels = {
+            'gzip_level': settings.COMPRESSION_GZIP_LEVEL,
+            'brotli_quality': settings.COMPRESSION_BROTLI_QUALITY,
+        }
+
+        self.stdout.write("CPU milliseconds per response, averaged over --repeat runs")
+        self.stdout.write(
+            f"{'resource':<14}{'bytes':>10}{'serialize model':>17}{'serialize values':>18}{'render drf':>12}{'render orjson':>15}{'parse json':>12}{'parse orjson':>14}"
+            + ''.join(f"{encoding + ' bytes':>12}{encoding + ' ms':>9}" for encoding in encodings)
+        )
+        for resource in options['resources']:
+            request = APIRequestFactory().get(f'/api/{resource}/')
+            force_authenticate(request, user=user)
+            view = viewsets[resource](action_map={'get': 'list'})
+            view.setup(request)
+            view.request, view.format_kwarg = view.initialize_request(request), None
+            queryset = view.filter_queryset(view.get_queryset())
+            # .all(): a fresh queryset per run, so both sides include the query
+            model_ms, data = cpu_ms(
+                lambda: view.get_serializer_class()(queryset.all(), many=True, context=view.get_serializer_context()).data,
+                repeat,
+            )
+            values_ms = 0.0
+            if getattr(view, 'values_serializer_class', None):
+                values_ms, data = cpu_ms(lambda: view.get_serializer(queryset.all(), many=True).data, repeat)
+
+            drf_ms, body = cpu_ms(lambda: JSONRenderer().render(data), repeat)
+            orjson_ms, fast_body = cpu_ms(lambda: ORJSONRenderer().render(data), repeat)
+            json_parse_ms, _ = cpu_ms(lambda: json.loads(body), repeat)
+            orjson_parse_ms, _ = cpu_ms(lambda: orjson.loads(fast_body), repeat)
+            line = (
+                f"{resource:<14}{len(body):>10}{model_ms:>17.2f}{values_ms:>18.2f}{drf_ms:>12.2f}{orjson_ms:>15.2f}"
+                f"{json_parse_ms:>12.2f}{orjson_parse_ms:>14.2f}"
+            )
+            for encoding in encodings:
+                # A fresh compressor per run, as each response gets its own
+                compress_ms, compressed = cpu_ms(lambda: Compressor(encoding, **levels).compress(fast_body), repeat)
+                line += f"{len(compressed):>12}{compress_ms:>9.2f}"
+            self.stdout.write(line)
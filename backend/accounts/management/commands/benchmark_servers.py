@@ -0,0 +1,157 @@
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    '/api/auth/user/', '/api/habits/', '/api/expenses/', '/api/tasks/', '/api/notes/',
+    '/api/finance-categories/', '/api/achievements/',
+]
+
+SERVERS = {
+    # Threaded WSGI workers, as deployed today
+    'wsgi': ('gunicorn', lambda port, workers, threads: [
+        sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers), '--worker-class', 'gthread', '--threads', str(threads),
+    ]),
+    # Event-loop workers serving the async read views
+    'asgi': ('uvicorn', lambda port, workers, threads: [
+        sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--no-access-log',
+    ]),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health/')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server on port {port} did not answer /api/health/ within {timeout}s")
+
+
+def login(port, username, password):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    body = json.dumps({'username': username, 'password': password})
+    connection.request('POST', '/api/auth/login/', body, {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise CommandError(f"Login as {username} failed with status {response.status}")
+    cookie = SimpleCookie()
+    for header in response.headers.get_all('Set-Cookie', []):
+        cookie.load(header)
+    return '; '.join(f'{name}={morsel.value}' for name, morsel in cookie.items())
+
+
+def run_load(port, cookie, paths, concurrency, duration):
+    """``concurrency`` keep-alive clients cycling through ``paths`` for ``duration`` seconds."""
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        timings, failed, index = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Cookie': cookie, 'Accept': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(timings)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read throughput of the API under gunicorn (WSGI) and uvicorn (ASGI). "
+        "Seed a user first, e.g. with seed_demo_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='demo1')
+        parser.add_argument('--password', default='demo1234')
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS, help="GET paths requested in turn.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Simultaneous keep-alive clients.")
+        parser.add_argument('--duration', type=float, default=10, help="Seconds of load per server.")
+        parser.add_argument('--workers', type=int, default=2, help="Worker processes per server.")
+        parser.add_argument('--threads', type=int, default=8, help="Threads per gunicorn worker.")
+
+    def handle(self, *args, **options):
+        for name in options['servers']:
+            module = SERVERS[name][0]
+            if importlib.util.find_spec(module) is None:
+                raise CommandError(f"'{module}' is not installed (pip install -r requirements.txt)")
+
+        for name in options['servers']:
+            module, command = SERVERS[name]
+            port = free_port()
+            process = subprocess.Popen(
+                command(port, options['workers'], options['threads']),
+                cwd=settings.BASE_DIR, env=os.environ.copy(),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_up(port, process)
+                cookie = login(port, options['username'], options['password'])
+                # One pass to warm connections and the response cache
+                run_load(port, cookie, options['paths'], 1, 0.5)
+                latencies, errors, elapsed = run_load(
+                    port, cookie, options['paths'], options['concurrency'], options['duration'],
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+            latencies.sort()
+            self.stdout.write(
+                f"{name} ({module}): {len(latencies) / elapsed:.0f} req/s, {len(latencies)} ok, {errors} failed, "
+                f"p50 {percentile(latencies, 0.5) * 1000:.1f}ms, p99 {percentile(latencies, 0.99) * 1000:.1f}ms"
+            )
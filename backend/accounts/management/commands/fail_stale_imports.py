@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.importers import fail_stale_imports
+
+
+class Command(BaseCommand):
+    help = "Mark statement imports stuck in pending/running (their worker died) as failed. Safe to schedule."
+
+    def handle(self, *args, **options):
+        failed = fail_stale_imports()
+        self.stdout.write(self.style.SUCCESS(f"Marked {failed} stale imports as failed"))
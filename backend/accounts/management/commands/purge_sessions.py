@@ -0,0 +1,26 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in batches, so a large backlog does not hold one long delete "
+        "on the session table (Django's clearsessions uses a single statement)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        # Cached copies expire on their own within SESSION_CACHE_TIMEOUT
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions"))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete tombstones older than TOMBSTONE_RETENTION_DAYS; older ?since= cursors get 410 Gone."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Override TOMBSTONE_RETENTION_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.TOMBSTONE_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        expired = Tombstone.objects.filter(deleted_at__lt=cutoff)
+
+        deleted = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += Tombstone.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones older than {days} days"))
@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.budgets import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the monthly budget rollups from the expense table (all users, or one)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=None, help="Only rebuild this username.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user named {options['user']!r}")
+        rebuild_rollups(user)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt budget rollups for {user.username if user else 'all users'}"))
@@ -0,0 +1,52 @@
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import Habit, HabitCompletion, compute_streak_stats
+from accounts.versioning import mark_changed
+
+
+class Command(BaseCommand):
+    help = "Rebuild the streak/completion counters on every Habit from its HabitCompletion rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Habits processed per query batch.")
+        parser.add_argument('--user', help="Only recompute habits owned by this username.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        habits = Habit.objects.order_by('id').only('id', 'user_id', *Habit.STATS_FIELDS)
+        if options['user']:
+            habits = habits.filter(user__username=options['user'])
+
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(habits.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            rows = (
+                HabitCompletion.objects.filter(habit_id__in=[habit.id for habit in batch])
+                .order_by('habit_id', 'date')
+                .values_list('habit_id', 'date')
+            )
+            stats = {
+                habit_id: compute_streak_stats(day for _, day in group)
+                for habit_id, group in groupby(rows.iterator(chunk_size=2000), key=lambda row: row[0])
+            }
+            empty = compute_streak_stats([])
+            now = timezone.now()
+            for habit in batch:
+                for field, value in stats.get(habit.id, empty).items():
+                    setattr(habit, field, value)
+                habit.updated_at = now
+
+            Habit.objects.bulk_update(batch, [*Habit.STATS_FIELDS, 'updated_at'])
+            for user_id in {habit.user_id for habit in batch}:
+                mark_changed(user_id, 'habits')
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed stats for {updated} habits"))
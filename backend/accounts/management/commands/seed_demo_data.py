@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.demo_data import seed_user
+
+
+class Command(BaseCommand):
+    help = "Create demo users with realistic multi-year habits, expenses, notes, tasks and achievements."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help="Number of users to create.")
+        parser.add_argument('--prefix', default='demo', help="Usernames are <prefix>1, <prefix>2, ...")
+        parser.add_argument('--password', default='demo1234', help="Password for every created user.")
+        parser.add_argument('--years', type=int, default=3, help="Years of daily habit/expense history.")
+        parser.add_argument('--expenses-per-day', type=int, default=3, help="Average expenses per day.")
+        parser.add_argument('--notes', type=int, default=200)
+        parser.add_argument('--tasks', type=int, default=300)
+        parser.add_argument('--quadrant-tasks', type=int, default=100)
+        parser.add_argument('--thoughts', type=int, default=20)
+        parser.add_argument('--achievements', type=int, default=150)
+        parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible data.")
+        parser.add_argument('--replace', action='store_true', help="Delete existing users with the same names first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        usernames = [f"{options['prefix']}{index}" for index in range(1, options['users'] + 1)]
+
+        existing = User.objects.filter(username__in=usernames)
+        if existing.exists():
+            if not options['replace']:
+                raise CommandError("Some demo users already exist; pass --replace to recreate them.")
+            existing.delete()
+
+        for username in usernames:
+            started = time.perf_counter()
+            with transaction.atomic():
+                user = User.objects.create_user(username=username, password=options['password'], first_name=username)
+                counts = seed_user(
+                    user,
+                    years=options['years'],
+                    expenses_per_day=options['expenses_per_day'],
+                    notes=options['notes'],
+                    tasks=options['tasks'],
+                    quadrant_tasks=options['quadrant_tasks'],
+                    thoughts=options['thoughts'],
+                    achievements=options['achievements'],
+                    rng=rng,
+                )
+            summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+            self.stdout.write(f"{username}: {summary} ({time.perf_counter() - started:.1f}s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {len(usernames)} users"))
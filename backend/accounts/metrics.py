@@ -0,0 +1,167 @@
+"""In-process request metrics rendered in the Prometheus text exposition format.
+
+Each worker process keeps its own registry; scrape every worker (or aggregate in the
+scraper) when running several gunicorn/uvicorn workers.
+"""
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# psycopg_pool statistic -> (metric, type, help, scale); see DB_POOL in settings.py
+POOL_STATS = {
+    'pool_size': ('dailyforge_db_pool_connections', 'gauge', 'Connections held by the pool.', 1),
+    'pool_available': ('dailyforge_db_pool_idle_connections', 'gauge', 'Idle connections in the pool.', 1),
+    'requests_waiting': ('dailyforge_db_pool_waiting_requests', 'gauge', 'Requests waiting for a connection now.', 1),
+    'requests_num': ('dailyforge_db_pool_requests_total', 'counter', 'Connections handed out by the pool.', 1),
+    'requests_queued': ('dailyforge_db_pool_queued_requests_total', 'counter', 'Requests that had to wait for a connection.', 1),
+    'requests_wait_ms': ('dailyforge_db_pool_wait_seconds_total', 'counter', 'Time requests spent waiting for a connection.', 0.001),
+    'requests_errors': ('dailyforge_db_pool_request_errors_total', 'counter', 'Requests that timed out waiting for a connection.', 1),
+    'connections_num': ('dailyforge_db_pool_connects_total', 'counter', 'Connections opened by the pool.', 1),
+    'connections_ms': ('dailyforge_db_pool_connect_seconds_total', 'counter', 'Time spent opening connections.', 0.001),
+    'connections_errors': ('dailyforge_db_pool_connect_errors_total', 'counter', 'Failed connection attempts.', 1),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            yield bound, running
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def pool_stats():
+    """``{alias: psycopg_pool stats}`` for the pooled databases of this process."""
+    from django.db import connections
+
+    return {
+        alias: connections[alias].pool.get_stats()
+        for alias in connections
+        if connections.settings[alias].get('OPTIONS', {}).get('pool')
+    }
+
+
+class MetricsRegistry:
+    """Per-view latency and database usage, keyed by (method, view name), plus response cache
+    hits, database connections opened and connection pool usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._db_seconds = {}
+        self._responses = {}
+        self._cache = {}
+        self._connections = {}
+
+    def observe_request(self, method, view, status, duration, query_count, db_seconds):
+        key = (method, view)
+        with self._lock:
+            self._latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            self._queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(query_count)
+            self._db_seconds[key] = self._db_seconds.get(key, 0.0) + db_seconds
+            status_key = (method, view, status)
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+
+    def observe_cache(self, resource, result):
+        """Count a response cache lookup; ``result`` is ``hit`` or ``miss``."""
+        key = (resource, result)
+        with self._lock:
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def observe_connection(self, alias):
+        """Count a database connection opened (checked out of the pool, when pooled)."""
+        with self._lock:
+            self._connections[alias] = self._connections.get(alias, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            for series in (self._latency, self._queries, self._db_seconds, self._responses, self._cache, self._connections):
+                series.clear()
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP dailyforge_http_responses_total Responses by view and status code.',
+                '# TYPE dailyforge_http_responses_total counter',
+            ]
+            for (method, view, status), count in sorted(self._responses.items()):
+                lines.append(f'dailyforge_http_responses_total{{{_labels(method=method, view=view, status=status)}}} {count}')
+
+            lines += self._render_histogram(
+                'dailyforge_http_request_duration_seconds', 'Request latency by view.', self._latency,
+            )
+            lines += self._render_histogram(
+                'dailyforge_db_queries_per_request', 'SQL queries executed per request.', self._queries,
+            )
+
+            lines += [
+                '# HELP dailyforge_db_query_duration_seconds_total Time spent in SQL queries by view.',
+                '# TYPE dailyforge_db_query_duration_seconds_total counter',
+            ]
+            for (method, view), seconds in sorted(self._db_seconds.items()):
+                lines.append(f'dailyforge_db_query_duration_seconds_total{{{_labels(method=method, view=view)}}} {seconds:.6f}')
+
+            lines += [
+                '# HELP dailyforge_response_cache_total Response cache lookups by collection and result.',
+                '# TYPE dailyforge_response_cache_total counter',
+            ]
+            for (resource, result), count in sorted(self._cache.items()):
+                lines.append(f'dailyforge_response_cache_total{{{_labels(resource=resource, result=result)}}} {count}')
+
+            lines += [
+                '# HELP dailyforge_db_connections_opened_total Database connections opened (pool checkouts when pooled).',
+                '# TYPE dailyforge_db_connections_opened_total counter',
+            ]
+            for alias, count in sorted(self._connections.items()):
+                lines.append(f'dailyforge_db_connections_opened_total{{{_labels(alias=alias)}}} {count}')
+
+        lines += self._render_pools(pool_stats())
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_pools(pools):
+        if not pools:
+            return []
+        lines = []
+        for stat, (name, kind, help_text, scale) in POOL_STATS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for alias, stats in sorted(pools.items()):
+                lines.append(f'{name}{{{_labels(alias=alias)}}} {stats.get(stat, 0) * scale:g}')
+        return lines
+
+    @staticmethod
+    def _render_histogram(name, help_text, histograms):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (method, view), histogram in sorted(histograms.items()):
+            labels = _labels(method=method, view=view)
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return lines
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,161 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .compression import Compressor, acompress_stream, choose_encoding, compress_stream, is_compressible
+from .metrics import registry
+
+logger = logging.getLogger('accounts.requests')
+
+# The QueryTimer of the request being handled. Context variables follow a request into the
+# threads running its ORM calls under ASGI, where a per-connection wrapper would not.
+current_timer = ContextVar('query_timer', default=None)
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` hook counting SQL queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+def _time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver: counts the connection and routes its queries through
+    the current request's timer."""
+    registry.observe_connection(connection.alias)
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class RequestMetricsMiddleware:
+    """Records latency, SQL query count and SQL time for every request.
+
+    Results go to the in-process metrics registry (served at /api/metrics/), a
+    ``Server-Timing`` response header, and one structured log line per request.
+    Place it first in MIDDLEWARE so session and auth queries are counted too. Works both
+    under WSGI and, without a thread hop, under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_seconds = getattr(settings, 'SLOW_REQUEST_MS', 1000) / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer, start = QueryTimer(), time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timer, start = QueryTimer(), time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    def record(self, request, response, timer, duration):
+        match = request.resolver_match
+        view = (match.view_name or match.url_name or match.route) if match else 'unmatched'
+        registry.observe_request(request.method, view, response.status_code, duration, timer.count, timer.seconds)
+        response['Server-Timing'] = f'app;dur={duration * 1000:.1f}, db;dur={timer.seconds * 1000:.1f}'
+
+        level = logging.WARNING if duration >= self.slow_request_seconds else logging.DEBUG
+        logger.log(
+            level,
+            'request method=%s path=%s view=%s status=%s duration_ms=%.1f db_queries=%d db_ms=%.1f',
+            request.method, request.path, view, response.status_code,
+            duration * 1000, timer.count, timer.seconds * 1000,
+        )
+        return response
+
+
+class CompressionMiddleware:
+    """brotli/gzip for text responses of at least ``COMPRESSION_MIN_BYTES``.
+
+    Like Django's GZipMiddleware it also encodes streamed responses (the export) and
+    weakens strong ETags, as the encoded body is a different representation; the
+    conditional list views compare ETags weakly, so revalidation keeps working.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_bytes = getattr(settings, 'COMPRESSION_MIN_BYTES', 1024)
+        self.options = {
+            'brotli_quality': getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4),
+            'gzip_level': getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6),
+        }
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < self.min_bytes:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        compressor = Compressor(encoding, **self.options)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, compressor)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, compressor)
+            del response['Content-Length']
+        else:
+            compressed = compressor.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_expense_user_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['user', '-date_earned', '-created_at'], name='achievement_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(fields=['user', '-created_at'], name='habit_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', '-updated_at'], name='note_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quadrant',
+            index=models.Index(fields=['user', 'name'], name='quadrant_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quadranttask',
+            index=models.Index(fields=['user', '-created_at'], name='quadranttask_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='thought',
+            index=models.Index(fields=['user', '-updated_at'], name='thought_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+import datetime
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def _parse_day(key):
+    try:
+        return datetime.date.fromisoformat(str(key))
+    except ValueError:
+        return None
+
+
+def forwards(apps, schema_editor):
+    """Expand each habit's completed_by_date blob into HabitCompletion rows, in batches."""
+    Habit = apps.get_model('accounts', 'Habit')
+    HabitCompletion = apps.get_model('accounts', 'HabitCompletion')
+
+    pending = []
+    habits = Habit.objects.exclude(completed_by_date={}).only('id', 'completed_by_date')
+    for habit in habits.iterator(chunk_size=BATCH_SIZE):
+        for key, value in (habit.completed_by_date or {}).items():
+            day = _parse_day(key)
+            if value and day is not None:
+                pending.append(HabitCompletion(habit_id=habit.id, date=day))
+        if len(pending) >= BATCH_SIZE:
+            HabitCompletion.objects.bulk_create(pending, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            pending = []
+    if pending:
+        HabitCompletion.objects.bulk_create(pending, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def backwards(apps, schema_editor):
+    """Rebuild the JSON blobs from HabitCompletion rows."""
+    Habit = apps.get_model('accounts', 'Habit')
+    HabitCompletion = apps.get_model('accounts', 'HabitCompletion')
+
+    blobs = {}
+    rows = HabitCompletion.objects.order_by('habit_id', 'date').values_list('habit_id', 'date')
+    for habit_id, day in rows.iterator(chunk_size=BATCH_SIZE):
+        blobs.setdefault(habit_id, {})[day.isoformat()] = True
+
+    batch = []
+    for habit in Habit.objects.filter(id__in=list(blobs)).only('id').iterator(chunk_size=BATCH_SIZE):
+        habit.completed_by_date = blobs[habit.id]
+        batch.append(habit)
+        if len(batch) >= BATCH_SIZE:
+            Habit.objects.bulk_update(batch, ['completed_by_date'])
+            batch = []
+    if batch:
+        Habit.objects.bulk_update(batch, ['completed_by_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_habitcompletion'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_copy_habit_completions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='habit',
+            name='completed_by_date',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-17 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_remove_habit_completed_by_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='last_completed',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='total_completions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
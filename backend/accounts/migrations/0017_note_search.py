@@ -0,0 +1,102 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL: a weighted tsvector (title > category > content) maintained by a trigger,
+# so bulk inserts and raw updates are indexed too, plus a GIN index over it.
+POSTGRES_FORWARD = [
+    """
+    CREATE FUNCTION accounts_note_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.category, '')), 'B') ||
+            setweight(to_tsvector('pg_catalog.english', coalesce(NEW.content, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER accounts_note_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, category, content ON accounts_note
+    FOR EACH ROW EXECUTE FUNCTION accounts_note_search_vector_update()
+    """,
+    "UPDATE accounts_note SET title = title",
+    "CREATE INDEX note_search_vector_idx ON accounts_note USING gin (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS note_search_vector_idx",
+    "DROP TRIGGER IF EXISTS accounts_note_search_vector_trigger ON accounts_note",
+    "DROP FUNCTION IF EXISTS accounts_note_search_vector_update()",
+]
+
+# SQLite: an external-content FTS5 table kept in sync by triggers
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE accounts_note_fts USING fts5(
+        title, category, content, content='accounts_note', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER accounts_note_fts_insert AFTER INSERT ON accounts_note BEGIN
+        INSERT INTO accounts_note_fts(rowid, title, category, content)
+        VALUES (new.id, new.title, new.category, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_note_fts_delete AFTER DELETE ON accounts_note BEGIN
+        INSERT INTO accounts_note_fts(accounts_note_fts, rowid, title, category, content)
+        VALUES ('delete', old.id, old.title, old.category, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_note_fts_update AFTER UPDATE OF title, category, content ON accounts_note BEGIN
+        INSERT INTO accounts_note_fts(accounts_note_fts, rowid, title, category, content)
+        VALUES ('delete', old.id, old.title, old.category, old.content);
+        INSERT INTO accounts_note_fts(rowid, title, category, content)
+        VALUES (new.id, new.title, new.category, new.content);
+    END
+    """,
+    "INSERT INTO accounts_note_fts(accounts_note_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS accounts_note_fts_update",
+    "DROP TRIGGER IF EXISTS accounts_note_fts_delete",
+    "DROP TRIGGER IF EXISTS accounts_note_fts_insert",
+    "DROP TABLE IF EXISTS accounts_note_fts",
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+}
+
+
+def _run(schema_editor, direction):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[direction]:
+            schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_updated_at_and_tombstones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-18 00:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_expenseimport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='recurrence',
+            field=models.CharField(blank=True, choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='recurrence_next',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='recurrence_source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='accounts.expense'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='recurrence_until',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(condition=models.Q(('recurrence_next__isnull', False)), fields=['recurrence_next'], name='expense_recurrence_next_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='expense',
+            constraint=models.UniqueConstraint(fields=('recurrence_source', 'date'), name='expense_occurrence_unique'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.4 on 2026-10-18 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    Expense = apps.get_model('accounts', 'Expense')
+    BudgetRollup = apps.get_model('accounts', 'BudgetRollup')
+    db = schema_editor.connection.alias
+    totals = (
+        Expense.objects.using(db).order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'category_id', 'month')
+        .annotate(
+            spend_total=Sum('amount', filter=Q(amount__lt=0)),
+            income_total=Sum('amount', filter=Q(amount__gte=0)),
+            rows=Count('id'),
+        )
+    )
+    BudgetRollup.objects.using(db).bulk_create([
+        BudgetRollup(
+            user_id=row['user_id'], category_id=row['category_id'], month=row['month'],
+            spent=-(row['spend_total'] or 0), income=row['income_total'] or 0, count=row['rows'],
+        )
+        for row in totals.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_expense_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('spent', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='accounts.financecategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'month'], name='budget_rollup_user_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('category', 'month'), name='budget_rollup_category_month')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
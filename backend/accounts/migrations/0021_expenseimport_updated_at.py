@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0020_budgetrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseimport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
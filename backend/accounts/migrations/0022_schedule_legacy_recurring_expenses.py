@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import recurrence_date
+
+
+def schedule_legacy_rules(apps, schema_editor):
+    """Turn expenses that only had ``is_recurring`` into monthly rules, as the API does.
+
+    Their next occurrence is the first one after their date, so the generator also creates
+    the copies that were never made. Their users' expense list ETags change with them.
+    """
+    Expense = apps.get_model('accounts', 'Expense')
+    CollectionVersion = apps.get_model('accounts', 'CollectionVersion')
+    db = schema_editor.connection.alias
+    legacy = Expense.objects.using(db).filter(is_recurring=True, recurrence='')
+    now = timezone.now()
+    users = set()
+    for expense in legacy.only('id', 'user_id', 'date').iterator():
+        Expense.objects.using(db).filter(pk=expense.pk).update(
+            recurrence='monthly', recurrence_interval=1,
+            recurrence_next=recurrence_date(expense.date, 'monthly', 1, 1), updated_at=now,
+        )
+        users.add(expense.user_id)
+    versions = CollectionVersion.objects.using(db).filter(resource='expenses', user_id__in=users)
+    versions.update(version=F('version') + 1)
+    CollectionVersion.objects.using(db).bulk_create([
+        CollectionVersion(user_id=user_id, resource='expenses', version=1)
+        for user_id in users - set(versions.values_list('user_id', flat=True))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0021_expenseimport_updated_at'),
+    ]
+
+    operations = [
+        # Reversing keeps the schedules: rolling back 0019 drops them with the columns
+        migrations.RunPython(schedule_legacy_rules, migrations.RunPython.noop),
+    ]
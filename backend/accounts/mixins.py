@@ -0,0 +1,224 @@
+from django.db import transaction
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .response_cache import get_response_data, set_response_data
+from .serializers import PrefetchedPrimaryKeyRelatedField
+from .sync import changes_since, cursor_expired, make_cursor, parse_cursor
+from .values_serializers import ValuesListSerializer
+from .versioning import get_versions, make_etag, mark_changed
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def etag_matches(request, etag):
+    """True when ``If-None-Match`` lists ``etag`` (weak comparison, as for GET in RFC 9110)."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in parse_etags(header)}
+
+
+class ConditionalListMixin:
+    """Versioned ``ETag`` on the list action of a ModelViewSet.
+
+    The tag is derived from the user's ``collection`` version (see ``versioning.py``),
+    so a matching ``If-None-Match`` is answered with ``304 Not Modified`` after a single
+    indexed lookup, before the list query runs or anything is serialized. Other requests
+    are served from the response cache when it holds data for the same tag.
+
+    Full lists carry an ``X-Sync-Cursor`` header; ``?since=<cursor>`` then returns only the
+    rows saved and the ids deleted after it (see ``sync.py``). Rows that were saved but
+    left the list's filters (a deactivated thought, a note moved to another category)
+    count as deleted.
+
+    Whole lists (not pages) are read with ``values_serializer_class`` (see
+    ``values_serializers.py``): one query, no model instances. ``None`` opts a view out.
+    """
+
+    collection = None
+    values_serializer_class = ValuesListSerializer
+
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        if 'since' in request.query_params:
+            return self.list_changes(request, request.query_params['since'])
+
+        cursor = make_cursor()
+        etag = make_etag(request.user, get_versions(request.user, [self.collection]), request)
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = get_response_data(self.collection, etag)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = super().list(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    set_response_data(etag, response.data)
+        response['ETag'] = etag
+        # Let browsers keep the body but revalidate it on every use
+        response['Cache-Control'] = 'private, no-cache'
+        response['X-Sync-Cursor'] = cursor
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        if self.values_serializer_class and kwargs.get('many') and args and isinstance(args[0], QuerySet):
+            return self.values_serializer_class(args[0], self.get_serializer_class(), self.get_serializer_context())
+        return super().get_serializer(*args, **kwargs)
+
+    def list_changes(self, request, raw_cursor):
+        """``?since=<cursor>``: rows saved and ids deleted after the cursor, plus a new cursor."""
+        moment = parse_cursor(raw_cursor)
+        if moment is None:
+            return Response({"error": "'since' must be a cursor returned by this API"}, status=status.HTTP_400_BAD_REQUEST)
+        if cursor_expired(moment):
+            return Response(
+                {"error": "Cursor is too old; reload the full list"},
+                status=status.HTTP_410_GONE,
+            )
+
+        cursor = make_cursor()
+        owned = self.get_queryset().model.objects.filter(user=request.user)
+        changed, deleted = changes_since(
+            self.filter_queryset(self.get_queryset()), request.user, self.collection, moment, owned=owned,
+        )
+        return Response({
+            'cursor': cursor,
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+        })
+
+
+class BulkModelMixin:
+    """Adds ``<resource>/bulk/`` to a ModelViewSet.
+
+    * ``POST``   a list of objects         -> ``bulk_create``
+    * ``PATCH``  a list of ``{"id", ...}``   -> ``bulk_update`` of the sent fields
+    * ``DELETE`` ``{"ids": [...]}`` (or ``?ids=1,2``) -> one filtered ``delete()`` per batch, in one transaction
+
+    Every item is validated before anything is written; on failure the response is a
+    list of per-item errors aligned with the request (``{}`` for valid items).
+    Related primary keys are resolved with one query per related model, so the number
+    of queries depends on the number of batches, not on the number of rows.
+    Creates and updates skip model signals, so they bump ``collection`` explicitly; views
+    that keep other derived data override ``perform_bulk_create``/``perform_bulk_update``.
+    """
+
+    bulk_batch_size = 500
+    bulk_max_items = 5000
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"error": f"At most {self.bulk_max_items} items per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == 'POST':
+            return self.bulk_create(request, items)
+        return self.bulk_update(request, items)
+
+    def get_bulk_serializer_context(self, items):
+        """Serializer context with every referenced related object preloaded (user-scoped)."""
+        context = self.get_serializer_context()
+        related = {}
+        for name, field in self.get_serializer().fields.items():
+            if not isinstance(field, PrefetchedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            ids = {_as_int(item.get(name)) for item in items if isinstance(item, dict)}
+            ids.discard(None)
+            related[field.queryset.model] = field.queryset.filter(user=self.request.user).in_bulk(ids)
+        context['related_objects'] = related
+        return context
+
+    def bulk_create(self, request, items):
+        serializer = self.get_serializer(data=items, many=True, context=self.get_bulk_serializer_context(items))
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        objects = [model(user=request.user, **data) for data in serializer.validated_data]
+        self.perform_bulk_create(objects)
+        mark_changed(request.user.id, self.collection)
+        return Response(self.get_serializer(objects, many=True).data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, objects):
+        self.get_queryset().model.objects.bulk_create(objects, batch_size=self.bulk_batch_size)
+
+    def perform_bulk_update(self, instances, fields):
+        self.get_queryset().model.objects.bulk_update(instances, fields, batch_size=self.bulk_batch_size)
+
+    def get_bulk_update_queryset(self):
+        """The rows a PATCH may change; annotate here what validation would otherwise query per item."""
+        return self.get_queryset()
+
+    def bulk_update(self, request, items):
+        ids = [_as_int(item.get('id')) if isinstance(item, dict) else None for item in items]
+        instances = self.get_bulk_update_queryset().in_bulk([pk for pk in ids if pk is not None])
+        context = self.get_bulk_serializer_context(items)
+
+        serializers, errors, fields = [], [], set()
+        for pk, item in zip(ids, items):
+            instance = instances.get(pk)
+            if instance is None:
+                serializers.append(None)
+                errors.append({"id": ["Not found."]})
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True, context=context)
+            serializers.append(serializer)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        for serializer in serializers:
+            for field, value in serializer.validated_data.items():
+                setattr(serializer.instance, field, value)
+                fields.add(field)
+        updated = list({serializer.instance.pk: serializer.instance for serializer in serializers}.values())
+        if fields:
+            # bulk_update does not apply auto_now, which ?since= syncs rely on
+            now = timezone.now()
+            for instance in updated:
+                instance.updated_at = now
+            fields.add('updated_at')
+            self.perform_bulk_update(updated, sorted(fields))
+            mark_changed(request.user.id, self.collection)
+        return Response(self.get_serializer(updated, many=True).data)
+
+    def bulk_destroy(self, request):
+        raw_ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if raw_ids is None and request.query_params.get('ids'):
+            raw_ids = request.query_params['ids'].split(',')
+        if not isinstance(raw_ids, list) or not raw_ids:
+            return Response({"error": "'ids' must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        ids = [_as_int(pk) for pk in raw_ids]
+        if None in ids:
+            return Response({"error": "'ids' must contain integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        deleted = 0
+        with transaction.atomic(savepoint=False):
+            for start in range(0, len(ids), self.bulk_batch_size):
+                count, _ = self.get_queryset().filter(pk__in=ids[start:start + self.bulk_batch_size]).delete()
+                deleted += count
+        return Response({"deleted": deleted})
@@ -1,19 +1,258 @@
-from django.db import models
+import calendar
+from datetime import date as date_type, timedelta
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+ONE_DAY = timedelta(days=1)
+
+
+def compute_streak_stats(dates):
+    """Compute streak counters from completion dates given in ascending order."""
+    total = longest = run = 0
+    last = None
+    for day in dates:
+        run = run + 1 if last is not None and day == last + ONE_DAY else 1
+        longest = max(longest, run)
+        total += 1
+        last = day
+    return {
+        'current_streak': run,
+        'longest_streak': longest,
+        'total_completions': total,
+        'last_completed': last,
+    }
+
+
+def completion_runs(dates):
+    """Split ascending dates into ``[first, last]`` runs of consecutive days."""
+    runs = []
+    for day in dates:
+        if runs and day == runs[-1][1] + ONE_DAY:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def recurrence_date(anchor, frequency, interval, index):
+    """The ``index``-th occurrence of a rule starting on ``anchor`` (index 0 is ``anchor``).
+
+    Monthly and yearly rules keep the anchor's day of month, clamped to shorter months,
+    so a rule starting on Jan 31 falls on Feb 28 and then Mar 31.
+    """
+    if frequency == 'daily':
+        return anchor + timedelta(days=interval * index)
+    if frequency == 'weekly':
+        return anchor + timedelta(weeks=interval * index)
+    months = anchor.month - 1 + interval * index * (12 if frequency == 'yearly' else 1)
+    year, month = anchor.year + months // 12, months % 12 + 1
+    return date_type(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+
+
+def recurrence_index(anchor, frequency, interval, day):
+    """Index of the last occurrence on or before ``day`` (0 when ``day`` precedes ``anchor``)."""
+    if frequency in ('daily', 'weekly'):
+        step = interval * (7 if frequency == 'weekly' else 1)
+        return max((day - anchor).days // step, 0)
+    months = (day.year - anchor.year) * 12 + day.month - anchor.month
+    index = max(months // (interval * (12 if frequency == 'yearly' else 1)), 0)
+    if index and recurrence_date(anchor, frequency, interval, index) > day:
+        index -= 1
+    return index
+
+
 class Habit(models.Model):
+    STATS_FIELDS = ['current_streak', 'longest_streak', 'total_completions', 'last_completed']
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='habits')
     name = models.CharField(max_length=255)
     frequency = models.IntegerField(default=1)
     created_at = models.DateField(auto_now_add=True)
-    completed_by_date = models.JSONField(default=dict, blank=True)  # {"2026-01-02": true, ...}
     paused = models.BooleanField(default=False)
+    # Maintained incrementally by set_completed(); current_streak is the run ending at last_completed
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    total_completions = models.PositiveIntegerField(default=0)
+    last_completed = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.name}"
+
+    def set_completed(self, date, value=True):
+        """Mark or unmark a single day and update the streak counters.
+
+        The habit row is locked for the duration so concurrent toggles apply one after another.
+        """
+        with transaction.atomic():
+            locked = Habit.objects.select_for_update().only(*self.STATS_FIELDS).get(pk=self.pk)
+            for field in self.STATS_FIELDS:
+                setattr(self, field, getattr(locked, field))
+            if self.apply_completion(date, value):
+                self.save(update_fields=[*self.STATS_FIELDS, 'updated_at'])
+
+    def apply_completion(self, date, value):
+        """Insert or delete one completion and adjust the counters in memory.
+
+        The caller must hold a row lock on the habit and save ``STATS_FIELDS`` (and
+        ``updated_at``) afterwards.
+        Returns False when the day was already in the requested state.
+        """
+        last, current = self.last_completed, self.current_streak
+        in_current_run = last is not None and last - timedelta(days=current) < date <= last
+
+        if value:
+            if self.completions.filter(date=date).exists():
+                return False
+            HabitCompletion.objects.create(habit=self, date=date)
+            self.total_completions += 1
+            if last is None or date > last:
+                before = current if last is not None and date == last + ONE_DAY else 0
+                after = 0
+                self.last_completed, self.current_streak = date, before + 1
+            elif date == last - timedelta(days=current):
+                before, after = self._run_length(date - ONE_DAY, -ONE_DAY), current
+                self.current_streak = before + 1 + after
+            else:
+                before = self._run_length(date - ONE_DAY, -ONE_DAY)
+                after = self._run_length(date + ONE_DAY, ONE_DAY)
+            self.longest_streak = max(self.longest_streak, before + 1 + after)
+            return True
+
+        deleted, _ = self.completions.filter(date=date).delete()
+        if not deleted:
+            return False
+        self.total_completions -= 1
+        if in_current_run:
+            after = (last - date).days
+            before = current - after - 1
+        else:
+            before = self._run_length(date - ONE_DAY, -ONE_DAY)
+            after = self._run_length(date + ONE_DAY, ONE_DAY)
+
+        if date == last:
+            if before:
+                self.last_completed, self.current_streak = date - ONE_DAY, before
+            else:
+                previous = self.completions.filter(date__lt=date).order_by('-date').values_list('date', flat=True).first()
+                self.last_completed = previous
+                self.current_streak = self._run_length(previous, -ONE_DAY) if previous else 0
+        elif in_current_run:
+            self.current_streak = after
+
+        if before + 1 + after >= self.longest_streak:
+            # The removed day may have split the longest run; only this case needs a scan
+            self.longest_streak = self._longest_run()
+        return True
+
+    def stats_window(self, days):
+        """Dates that hold every run a change to ``days`` can touch, with a day to spare each side.
+
+        No run is longer than ``longest_streak``, so none reaches past the window from a changed day.
+        """
+        reach = timedelta(days=self.longest_streak + 1)
+        return min(days) - reach, max(days) + reach
+
+    def apply_completion_changes(self, added, removed, window_dates):
+        """Adjust the counters in memory for completions already inserted (``added``) and deleted.
+
+        ``window_dates`` are the habit's completions within ``stats_window(added | removed)``
+        after the change, ascending. Runs wholly inside the window are exact and include every
+        run the change touched, so the full history is only read when a removed day split the
+        only longest run. The caller must hold a row lock on the habit, as for apply_completion().
+        """
+        low, high = self.stats_window(added | removed)
+
+        def inner_runs(dates):
+            return [(first, last) for first, last in completion_runs(dates) if low < first and last < high]
+
+        window_longest = max(((last - first).days + 1 for first, last in inner_runs(window_dates)), default=0)
+        old_dates = sorted((set(window_dates) - added) | removed)
+        split_longest = any(
+            (last - first).days + 1 == self.longest_streak and any(first <= day <= last for day in removed)
+            for first, last in inner_runs(old_dates)
+        )
+
+        self.total_completions += len(added) - len(removed)
+        if self.last_completed is None or self.last_completed < high:
+            # The latest completion is in the window now, or there is none after it
+            if window_dates:
+                self.last_completed = window_dates[-1]
+                first = completion_runs(window_dates)[-1][0]
+                self.current_streak = (
+                    (self.last_completed - first).days + 1 if first > low
+                    else self._run_length(self.last_completed, -ONE_DAY)
+                )
+            else:
+                previous = self.completions.filter(date__lt=low).order_by('-date').values_list('date', flat=True).first()
+                self.last_completed = previous
+                self.current_streak = self._run_length(previous, -ONE_DAY) if previous else 0
+        if window_longest >= self.longest_streak or not split_longest:
+            self.longest_streak = max(self.longest_streak, window_longest)
+        else:
+            self.longest_streak = self._longest_run()
+
+    def _run_length(self, start, step):
+        """Count consecutive completed days from ``start`` walking by ``step``."""
+        if step < timedelta(0):
+            dates = self.completions.filter(date__lte=start).order_by('-date')
+        else:
+            dates = self.completions.filter(date__gte=start).order_by('date')
+        length, expected = 0, start
+        for day in dates.values_list('date', flat=True).iterator(chunk_size=64):
+            if day != expected:
+                break
+            length += 1
+            expected += step
+        return length
+
+    def _longest_run(self):
+        dates = self.completions.order_by('date').values_list('date', flat=True)
+        return compute_streak_stats(dates.iterator(chunk_size=2000))['longest_streak']
+
+    def recompute_stats(self, save=True):
+        """Rebuild the counters from the full completion history."""
+        dates = self.completions.order_by('date').values_list('date', flat=True)
+        for field, value in compute_streak_stats(dates.iterator(chunk_size=2000)).items():
+            setattr(self, field, value)
+        if save:
+            self.save(update_fields=[*self.STATS_FIELDS, 'updated_at'])
+
+    def set_completed_dates(self, dates):
+        """Replace the completion history with exactly ``dates``."""
+        dates = set(dates)
+        self.completions.exclude(date__in=dates).delete()
+        HabitCompletion.objects.bulk_create(
+            [HabitCompletion(habit=self, date=date) for date in dates],
+            ignore_conflicts=True,
+        )
+        self.recompute_stats()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='habit_user_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='habit_user_updated_idx'),
+        ]
+
+
+class HabitCompletion(models.Model):
+    """One row per day a habit was completed (replaces the old completed_by_date JSON blob)."""
+
+    habit = models.ForeignKey(Habit, on_delete=models.CASCADE, related_name='completions')
+    date = models.DateField()
+
+    def __str__(self):
+        return f"{self.habit.name} - {self.date}"
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['habit', 'date'], name='habitcompletion_habit_date_uniq'),
+        ]
 
 
 class FinanceCategory(models.Model):
@@ -21,6 +260,7 @@ class FinanceCategory(models.Model):
     name = models.CharField(max_length=100)
     color = models.CharField(max_length=20, default='#cbd5e0')
     budget = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.name}"
@@ -28,8 +268,33 @@ class FinanceCategory(models.Model):
     class Meta:
         ordering = ['name']
         unique_together = ['user', 'name']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='fincategory_user_updated_idx'),
+        ]
+
+class ExpenseQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the rows and take them out of the budget rollups in the same transaction."""
+        from .budgets import remove_expenses
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            remove_expenses(self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Expense(models.Model):
+    RECURRENCE_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    ]
+    # Changing any of these reschedules the rule
+    RULE_FIELDS = ['date', 'recurrence', 'recurrence_interval', 'recurrence_until']
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expenses')
     title = models.CharField(max_length=255)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -38,18 +303,104 @@ class Expense(models.Model):
     description = models.TextField(blank=True)
     is_recurring = models.BooleanField(default=False)
     category = models.ForeignKey(FinanceCategory, on_delete=models.CASCADE, related_name='expenses')
+    updated_at = models.DateTimeField(auto_now=True)
+    # A recurring expense is its own first occurrence; materialize_recurring_expenses copies
+    # it to every later due date, linking the copies back through recurrence_source
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, blank=True, default='')
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_until = models.DateField(null=True, blank=True)
+    # Next occurrence still to be created; null when the rule has ended or there is no rule
+    recurrence_next = models.DateField(null=True, blank=True)
+    recurrence_source = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences',
+    )
+
+    objects = ExpenseQuerySet.as_manager()
+
+    # Fields that decide which BudgetRollup row an expense counts towards, and by how much
+    ROLLUP_FIELDS = ['user_id', 'category_id', 'date', 'amount']
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.ROLLUP_FIELDS).issubset(field_names):
+            # What the row currently counts for, so a save can move it between rollups
+            instance.saved_rollup_state = instance.rollup_state()
+        return instance
     
     def __str__(self):
         return f"{self.user.username} - {self.title} - ${self.amount}"
+
+    def rollup_state(self):
+        return tuple(getattr(self, field) for field in self.ROLLUP_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # The post_save signal updates the budget rollups; keep both in one transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def occurrence_date(self, index):
+        return recurrence_date(self.date, self.recurrence, self.recurrence_interval, index)
+
+    def schedule(self, after=None):
+        """Set ``recurrence_next`` to the first occurrence after ``after`` (default: ``date``)."""
+        if not self.recurrence:
+            self.recurrence_next = None
+            return
+        index = 1
+        if after is not None and after >= self.date:
+            index = recurrence_index(self.date, self.recurrence, self.recurrence_interval, after) + 1
+        day = self.occurrence_date(index)
+        self.recurrence_next = day if self.recurrence_until is None or day <= self.recurrence_until else None
     
     class Meta:
         ordering = ['-date', '-id']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='expense_user_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='expense_user_updated_idx'),
+            models.Index(
+                fields=['recurrence_next'], name='expense_recurrence_next_idx',
+                condition=models.Q(recurrence_next__isnull=False),
+            ),
+        ]
+        constraints = [
+            # One copy per rule and day, so re-running the generator never duplicates
+            models.UniqueConstraint(fields=['recurrence_source', 'date'], name='expense_occurrence_unique'),
+        ]
+
+
+class BudgetRollup(models.Model):
+    """Spending and income of one finance category in one calendar month.
+
+    Kept in step with ``Expense`` writes by accounts/budgets.py; ``spent`` is the total of
+    negative amounts (as a positive number) and ``income`` the total of positive ones.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budget_rollups')
+    category = models.ForeignKey(FinanceCategory, on_delete=models.CASCADE, related_name='rollups')
+    # First day of the month
+    month = models.DateField()
+    spent = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category_id} {self.month:%Y-%m}: {self.spent}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'month'], name='budget_rollup_category_month'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month'], name='budget_rollup_user_month_idx'),
+        ]
 
 
 class TaskCategory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_categories')
     name = models.CharField(max_length=100)
     color = models.CharField(max_length=20, default='#cbd5e0')
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.name}"
@@ -57,6 +408,9 @@ class TaskCategory(models.Model):
     class Meta:
         ordering = ['name']
         unique_together = ['user', 'name']
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='taskcategory_user_updated_idx'),
+        ]
 
 
 
@@ -67,12 +421,17 @@ class Task(models.Model):
     description = models.TextField(blank=True)
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.title} ({self.category.name})"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='task_user_updated_idx'),
+        ]
 
 
 class Note(models.Model):
@@ -84,12 +443,18 @@ class Note(models.Model):
     pinned = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Filled by a database trigger on PostgreSQL (GIN-indexed); unused on SQLite, which
+    # keeps an FTS5 table instead. See migration 0017 and accounts/search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='note_user_updated_idx'),
+        ]
 
 class Quadrant(models.Model):
     """Represents a named quadrant configuration for a user (e.g. Eisenhower matrix cells)."""
@@ -99,12 +464,17 @@ class Quadrant(models.Model):
     description = models.TextField(blank=True)
     color = models.CharField(max_length=20, default='#ffffff')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username} - {self.name}"
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', 'name'], name='quadrant_user_name_idx'),
+            models.Index(fields=['user', 'updated_at'], name='quadrant_user_updated_idx'),
+        ]
 
 
 class QuadrantTask(models.Model):
@@ -124,12 +494,17 @@ class QuadrantTask(models.Model):
     time = models.TimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username} - {self.text} ({self.quadrant})"
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='quadranttask_user_created_idx'),
+            models.Index(fields=['user', 'updated_at'], name='quadranttask_user_updated_idx'),
+        ]
 
 
 class Thought(models.Model):
@@ -156,6 +531,9 @@ class Thought(models.Model):
 
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='thought_user_updated_idx'),
+        ]
 
 
 class Achievement(models.Model):
@@ -174,3 +552,76 @@ class Achievement(models.Model):
 
     class Meta:
         ordering = ['-date_earned', '-created_at']
+        indexes = [
+            models.Index(fields=['user', '-date_earned', '-created_at'], name='achievement_user_date_idx'),
+        ]
+
+
+class CollectionVersion(models.Model):
+    """Per-user change counter for one API collection (e.g. 'habits'), used for list ETags."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='collection_versions')
+    resource = models.CharField(max_length=50)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.resource} v{self.version}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'resource'], name='collectionversion_user_resource_uniq'),
+        ]
+
+
+class Tombstone(models.Model):
+    """Id of a deleted row, so ``?since=`` delta syncs can report deletions."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones')
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.resource} #{self.object_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'resource', 'deleted_at'], name='tombstone_user_resource_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+
+class ExpenseImport(models.Model):
+    """Progress and outcome of one CSV/OFX statement import (see accounts/importers.py)."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    FORMAT_CHOICES = [('csv', 'CSV'), ('ofx', 'OFX')]
+    MAX_ERRORS = 100
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expense_imports')
+    filename = models.CharField(max_length=255, blank=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    size = models.PositiveBigIntegerField(default=0)
+    bytes_read = models.PositiveBigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    # First MAX_ERRORS problems as [{"row": n, "error": "..."}]
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Touched with every progress save; a pending/running job that stops moving is stale
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.filename} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
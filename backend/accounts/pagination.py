@@ -0,0 +1,39 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ModelOrderingCursorPagination(CursorPagination):
+    """Keyset pagination that follows each model's ``Meta.ordering``.
+
+    Pagination is opt-in so existing clients keep receiving plain lists: a page is
+    only produced when the request carries ``?page_size=`` or a ``?cursor=``.
+    Each page is a ``WHERE <ordering field> < <cursor>`` query over the matching
+    ``(user, ...)`` index, so deep pages cost the same as the first one. Rows that tie on
+    that field (habits created the same day) are skipped by offset, which is only right when
+    their order is fixed, so the ordering always ends with the primary key.
+    """
+
+    page_size = None
+    default_page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        if page_size is None and self.cursor_query_param in request.query_params:
+            return self.default_page_size
+        return page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering)
+        pk = queryset.model._meta.pk.name
+        if ordering[-1].lstrip('-') in ('pk', pk):
+            return ordering
+        return (*ordering, f'-{pk}' if ordering[0].startswith('-') else pk)
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """Numbered pages for ranked search results, which have no stable keyset to seek on."""
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,108 @@
+"""Materialize due occurrences of recurring expenses.
+
+Rules are read in primary-key batches with ``values()``; each batch writes its copies with
+one ``bulk_create`` and advances ``recurrence_next`` with one ``UPDATE`` per distinct new
+date (rules due together mostly move to the same date), in a single transaction together
+with the budget rollups. The rules of a batch are locked with ``SELECT ... FOR UPDATE`` and
+skipped if another run advanced them meanwhile, so overlapping runs neither duplicate copies
+nor count them twice in the rollups; the ``(recurrence_source, date)`` unique constraint
+backs this up for copies left by an interrupted run.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .budgets import apply_rollups
+from .models import Expense
+from .versioning import mark_changed
+
+# A rule that is far behind is caught up over several passes, so a batch stays small
+MAX_COPIES_PER_RULE = 400
+RULE_COLUMNS = [
+    'id', 'user_id', 'title', 'amount', 'date', 'time', 'description', 'category_id',
+    'recurrence', 'recurrence_interval', 'recurrence_until', 'recurrence_next',
+]
+
+
+def due_rules(today):
+    return Expense.objects.filter(recurrence_next__lte=today).exclude(recurrence='')
+
+
+def _plan(rules, today):
+    """The copies due by ``today`` for ``rules``, each rule's new ``recurrence_next``, and
+    whether any rule is still behind."""
+    copies, advanced, behind = [], defaultdict(list), False
+    for rule in rules:
+        template = Expense(**{column: rule[column] for column in RULE_COLUMNS})
+        limit = min(today, rule['recurrence_until']) if rule['recurrence_until'] else today
+        day, count = rule['recurrence_next'], 0
+        while day <= limit:
+            if count == MAX_COPIES_PER_RULE:
+                behind = True
+                break
+            count += 1
+            copies.append(Expense(
+                user_id=rule['user_id'], title=rule['title'], amount=rule['amount'], date=day, time=rule['time'],
+                description=rule['description'], category_id=rule['category_id'], recurrence_source_id=rule['id'],
+            ))
+            template.schedule(after=day)
+            day = template.recurrence_next
+            if day is None:
+                break
+        advanced[template.recurrence_next].append(rule['id'])
+    return copies, advanced, behind
+
+
+def materialize_batch(rules, today):
+    """Create the copies due by ``today`` for ``rules`` (dicts of ``RULE_COLUMNS``).
+
+    Returns the number of copies written and whether any rule is still behind.
+    """
+    with transaction.atomic():
+        # Lock the rules; one that another run advanced since it was read is already done
+        current = dict(
+            Expense.objects.select_for_update().filter(id__in=[rule['id'] for rule in rules])
+            .order_by('id').values_list('id', 'recurrence_next')
+        )
+        rules = [rule for rule in rules if current.get(rule['id']) == rule['recurrence_next']]
+        copies, advanced, behind = _plan(rules, today)
+        if copies:
+            # Copies left by an interrupted run must not be counted in the budget rollups twice
+            existing = set(
+                Expense.objects.filter(
+                    recurrence_source_id__in={copy.recurrence_source_id for copy in copies},
+                    date__gte=min(copy.date for copy in copies),
+                ).values_list('recurrence_source_id', 'date')
+            )
+            copies = [copy for copy in copies if (copy.recurrence_source_id, copy.date) not in existing]
+        Expense.objects.bulk_create(copies, batch_size=1000, ignore_conflicts=True)
+        apply_rollups(added=[copy.rollup_state() for copy in copies])
+        now = timezone.now()
+        for next_day, ids in advanced.items():
+            Expense.objects.filter(id__in=ids).update(recurrence_next=next_day, updated_at=now)
+        for user_id in {rule['user_id'] for rule in rules}:
+            mark_changed(user_id, 'expenses')
+    return len(copies), behind
+
+
+def materialize_due(today=None, batch_size=1000):
+    """Materialize every rule due by ``today`` for all users; returns ``(rules, copies)``."""
+    today = today or timezone.localdate()
+    rules_done = copies_done = 0
+    last_id, behind = 0, False
+    while True:
+        rules = list(
+            due_rules(today).filter(id__gt=last_id).order_by('id').values(*RULE_COLUMNS)[:batch_size]
+        )
+        if not rules:
+            if not behind:
+                return rules_done, copies_done
+            # Another pass for the rules that hit MAX_COPIES_PER_RULE
+            last_id, behind = 0, False
+            continue
+        copies, batch_behind = materialize_batch(rules, today)
+        copies_done += copies
+        behind = behind or batch_behind
+        rules_done += len(rules)
+        last_id = rules[-1]['id']
@@ -0,0 +1,51 @@
+"""Per-user cache of serialized list/bootstrap responses.
+
+Entries are stored in the ``responses`` cache alias (see ``RESPONSE_CACHE_URL``) under the
+response's ETag, which already covers the user, the exact URL and the version of every
+collection it was built from. The post_save/post_delete handlers in ``signals.py`` bump
+those versions, so a write makes exactly that user's entries for the touched collections
+unreachable; they are evicted by the cache's TIMEOUT. Since the version is always read
+from the database, entries stay correct with per-process (locmem) caches too.
+"""
+from django.core.cache import caches
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from .metrics import registry
+
+
+def _cache():
+    return caches['responses']
+
+
+def _key(etag):
+    return 'response:' + etag.strip('"')
+
+
+def _plain(data):
+    """Drop the serializer references DRF attaches to its return containers so data pickles."""
+    if isinstance(data, (ReturnList, list)):
+        return list(data)
+    if isinstance(data, (ReturnDict, dict)):
+        return {key: _plain(value) for key, value in data.items()}
+    return data
+
+
+def get_response_data(resource, etag):
+    """Cached data for ``etag`` or None; counted as a hit or miss for ``resource``."""
+    data = _cache().get(_key(etag))
+    registry.observe_cache(resource, 'miss' if data is None else 'hit')
+    return data
+
+
+def set_response_data(etag, data):
+    _cache().set(_key(etag), _plain(data))
+
+
+async def aget_response_data(resource, etag):
+    data = await _cache().aget(_key(etag))
+    registry.observe_cache(resource, 'miss' if data is None else 'hit')
+    return data
+
+
+async def aset_response_data(etag, data):
+    await _cache().aset(_key(etag), _plain(data))
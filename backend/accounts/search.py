@@ -0,0 +1,49 @@
+"""Ranked full-text search over notes.
+
+PostgreSQL matches against ``Note.search_vector`` (GIN index, maintained by a trigger);
+SQLite uses the ``accounts_note_fts`` FTS5 table. Both are created by migration 0017.
+SQLite drops a table's triggers when Django rebuilds it for a schema change, so a later
+migration that alters ``accounts_note`` must recreate the FTS triggers.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# bm25() column weights in FTS5 column order (title, category, content); bm25 is negative,
+# better matches lower, so it is negated to sort like SearchRank
+SQLITE_RANK = "SELECT -bm25(accounts_note_fts, 10.0, 4.0, 1.0) FROM accounts_note_fts WHERE accounts_note_fts MATCH %s AND rowid = accounts_note.id"
+SQLITE_MATCH = "SELECT rowid FROM accounts_note_fts WHERE accounts_note_fts MATCH %s"
+
+
+def search_notes(queryset, text):
+    """Filter ``queryset`` to notes matching every word of ``text``, best match first."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        query = SearchQuery(text, config='english', search_type='websearch')
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-updated_at', '-id')
+        )
+
+    words = WORD_RE.findall(text)
+    if not words:
+        return queryset.none()
+    if vendor != 'sqlite':
+        # Unindexed, unranked scan for other backends
+        for word in words:
+            queryset = queryset.filter(Q(title__icontains=word) | Q(category__icontains=word) | Q(content__icontains=word))
+        return queryset.order_by('-updated_at', '-id')
+
+    # Quote every word so FTS5 operators in user input are matched literally
+    match = ' '.join('"%s"' % word for word in words)
+    return (
+        queryset.filter(id__in=RawSQL(SQLITE_MATCH, (match,)))
+        .annotate(rank=RawSQL(SQLITE_RANK, (match,), output_field=FloatField()))
+        .order_by('-rank', '-updated_at', '-id')
+    )
@@ -1,7 +1,13 @@
+from copy import copy
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import serializers
 from .models import (
     Habit,
     Expense,
+    ExpenseImport,
     FinanceCategory,
     TaskCategory,
     Task,
@@ -13,20 +19,162 @@ from .models import (
 )
 
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that resolves from ``context['related_objects']`` when a bulk view preloaded it.
+
+    Only rows of the requesting user can be referenced, so nobody can file an expense
+    (and its budget rollup) or a task under another user's category.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        if request is None:
+            return queryset
+        if not request.user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('related_objects', {}).get(self.queryset.model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return preloaded[int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+def current_streak(streak, last_completed):
+    """The stored run only counts as current while it reaches today or yesterday."""
+    yesterday = timezone.localdate() - timedelta(days=1)
+    if last_completed and last_completed >= yesterday:
+        return streak
+    return 0
+
+
+class CompletedByDateField(serializers.Field):
+    """Exposes HabitCompletion rows in the legacy ``{"YYYY-MM-DD": true}`` shape."""
+
+    def to_representation(self, completions):
+        return {completion.date.isoformat(): True for completion in completions.all()}
+
+    def to_internal_value(self, data):
+        if not isinstance(data, dict):
+            raise serializers.ValidationError('Expected an object mapping YYYY-MM-DD dates to booleans.')
+        dates = set()
+        for key, value in data.items():
+            try:
+                day = parse_date(str(key))
+            except ValueError:
+                day = None
+            if day is None:
+                raise serializers.ValidationError(f"'{key}' is not a YYYY-MM-DD date.")
+            if value:
+                dates.add(day)
+        return dates
+
+
 class HabitSerializer(serializers.ModelSerializer):
+    completed_by_date = CompletedByDateField(source='completions', required=False)
+    current_streak = serializers.SerializerMethodField()
+
     class Meta:
         model = Habit
-        fields = ['id', 'name', 'frequency', 'created_at', 'completed_by_date', 'paused']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'name', 'frequency', 'created_at', 'completed_by_date', 'paused',
+            'current_streak', 'longest_streak', 'total_completions', 'last_completed',
+        ]
+        read_only_fields = ['id', 'created_at', 'longest_streak', 'total_completions', 'last_completed']
+
+    def get_current_streak(self, habit):
+        return current_streak(habit.current_streak, habit.last_completed)
+
+    def create(self, validated_data):
+        dates = validated_data.pop('completions', None)
+        habit = super().create(validated_data)
+        if dates is not None:
+            habit.set_completed_dates(dates)
+        return habit
+
+    def update(self, instance, validated_data):
+        dates = validated_data.pop('completions', None)
+        habit = super().update(instance, validated_data)
+        if dates is not None:
+            habit.set_completed_dates(dates)
+        return habit
+
+
+class HabitStatsSerializer(HabitSerializer):
+    """Just the counters, for responses that should not resend the completion history."""
+
+    class Meta(HabitSerializer.Meta):
+        fields = ['id', 'current_streak', 'longest_streak', 'total_completions', 'last_completed']
+
+
+class HabitToggleSerializer(serializers.Serializer):
+    """One operation of a batch toggle."""
+
+    habit = serializers.IntegerField()
+    date = serializers.DateField()
+    value = serializers.BooleanField(default=True)
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
+    category = PrefetchedPrimaryKeyRelatedField(queryset=FinanceCategory.objects.all())
     category_name = serializers.CharField(source='category.name', read_only=True)
     
     class Meta:
         model = Expense
-        fields = ['id', 'title', 'amount', 'date', 'time', 'description', 'is_recurring', 'category', 'category_name']
-        read_only_fields = ['id', 'category_name']
+        fields = [
+            'id', 'title', 'amount', 'date', 'time', 'description', 'is_recurring', 'category', 'category_name',
+            'recurrence', 'recurrence_interval', 'recurrence_until', 'recurrence_next', 'recurrence_source',
+        ]
+        read_only_fields = ['id', 'category_name', 'recurrence_next', 'recurrence_source']
+        extra_kwargs = {'recurrence_interval': {'min_value': 1}}
+
+    def validate(self, attrs):
+        instance = self.instance if isinstance(self.instance, Expense) else None
+        if 'recurrence' not in attrs and 'is_recurring' in attrs:
+            # Clients that only send the flag get the monthly repeat their UI offers
+            current = instance.recurrence if instance else ''
+            attrs['recurrence'] = (current or 'monthly') if attrs['is_recurring'] else ''
+        if 'recurrence' in attrs:
+            attrs['is_recurring'] = bool(attrs['recurrence'])
+
+        if instance is None:
+            rule = Expense(**{field: attrs[field] for field in Expense.RULE_FIELDS if field in attrs})
+        elif any(field in attrs and attrs[field] != getattr(instance, field) for field in Expense.RULE_FIELDS):
+            rule = copy(instance)
+            for field in Expense.RULE_FIELDS:
+                setattr(rule, field, attrs.get(field, getattr(instance, field)))
+        else:
+            return attrs
+        if rule.recurrence and rule.recurrence_until and rule.recurrence_until < rule.date:
+            raise serializers.ValidationError({'recurrence_until': "Must not be before 'date'."})
+        # Continue after the copies that already exist rather than re-creating them; bulk
+        # updates annotate last_occurrence so this is not a query per item
+        if instance is None:
+            last = None
+        elif hasattr(instance, 'last_occurrence'):
+            last = instance.last_occurrence
+        else:
+            last = instance.occurrences.order_by('-date').values_list('date', flat=True).first()
+        rule.schedule(after=last)
+        attrs['recurrence_next'] = rule.recurrence_next
+        return attrs
+
+
+class ExpenseImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExpenseImport
+        fields = [
+            'id', 'filename', 'format', 'status', 'size', 'bytes_read', 'rows', 'imported',
+            'duplicates', 'failed', 'errors', 'created_at', 'finished_at',
+        ]
+        read_only_fields = fields
 
 
 class FinanceCategorySerializer(serializers.ModelSerializer):
@@ -43,6 +191,8 @@ class TaskCategorySerializer(serializers.ModelSerializer):
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    category = PrefetchedPrimaryKeyRelatedField(queryset=TaskCategory.objects.all())
+
     class Meta:
         model = Task
         fields = ['id', 'category', 'title', 'description', 'completed', 'created_at']
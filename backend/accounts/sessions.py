@@ -0,0 +1,77 @@
+"""Cached sessions and session users (``SESSION_ENGINE`` and ``AUTHENTICATION_BACKENDS``).
+
+Without these, every authenticated request reads ``django_session`` and then ``auth_user``
+before the view runs. ``SessionStore`` is Django's ``cached_db`` engine: writes go to the
+database and the ``sessions`` cache alias, reads try the cache first. ``CachedModelBackend``
+keeps the user of a session in the same cache, dropped by the post_save/post_delete handlers
+in ``signals.py`` whenever the user row changes (password, ``is_active``, ``last_login``).
+Within a request Django already loads the user once (``request.user`` is lazy and memoized).
+
+Entries live at most ``SESSION_CACHE_TIMEOUT`` seconds rather than the whole session age:
+with a per-process cache (locmem) a logout or password change in one worker reaches the
+others within that time. A shared cache (``SESSION_CACHE_URL=redis://...``) applies it at once.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.backends import cached_db
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+class _CappedCache:
+    """The session cache, with every timeout capped at ``SESSION_CACHE_TIMEOUT``."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def _timeout(self, timeout):
+        return settings.SESSION_CACHE_TIMEOUT if timeout is None else min(timeout, settings.SESSION_CACHE_TIMEOUT)
+
+    def set(self, key, value, timeout=None):
+        self._cache.set(key, value, self._timeout(timeout))
+
+    async def aset(self, key, value, timeout=None):
+        await self._cache.aset(key, value, self._timeout(timeout))
+
+
+class SessionStore(cached_db.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = _CappedCache(self._cache)
+
+
+def _user_key(user_id):
+    return f'session-user:{user_id}'
+
+
+def forget_user(user_id):
+    """Drop the cached copy of a user now and again once the current transaction commits.
+
+    The second delete covers a request that re-caches the old row before the write commits.
+    """
+    _cache().delete(_user_key(user_id))
+    transaction.on_commit(lambda: _cache().delete(_user_key(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    """``ModelBackend`` that loads session users from the session cache."""
+
+    def get_user(self, user_id):
+        key = _user_key(user_id)
+        user = _cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            _cache().set(key, user, settings.SESSION_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .budgets import apply_rollups
+from .sessions import forget_user
+from .models import Achievement, Expense, FinanceCategory, Habit, Note, Quadrant, QuadrantTask, Task, TaskCategory, Thought
+from .versioning import mark_changed, mark_deleted
+
+# Collections whose list output changes when a row of the model is written; the first
+# one is the model's own collection, under which its deletions are recorded. Expenses
+# embed their category's name, so category writes invalidate the expense list too.
+# HabitCompletion rows are not tracked: every completion change also saves the habit's
+# counters (or goes through toggle-batch, which marks the collection itself).
+TRACKED_MODELS = {
+    Habit: ('habits',),
+    Expense: ('expenses',),
+    FinanceCategory: ('finance-categories', 'expenses'),
+    TaskCategory: ('task-categories',),
+    Task: ('tasks',),
+    Note: ('notes',),
+    Quadrant: ('quadrants',),
+    QuadrantTask: ('quadrant-tasks',),
+    Thought: ('thoughts',),
+    Achievement: ('achievements',),
+}
+
+
+def collection_changed(sender, instance, **kwargs):
+    mark_changed(instance.user_id, *TRACKED_MODELS[sender])
+
+
+def collection_row_deleted(sender, instance, **kwargs):
+    mark_deleted(instance.user_id, TRACKED_MODELS[sender][0], instance.pk)
+    mark_changed(instance.user_id, *TRACKED_MODELS[sender])
+
+
+def finance_category_saved(sender, instance, created, **kwargs):
+    if not created:
+        # Expenses show their category's name, so they count as changed for ?since= syncs
+        Expense.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+# save(update_fields=...) names that can move an expense to another rollup
+ROLLUP_UPDATE_FIELDS = {'user', 'user_id', 'category', 'category_id', 'date', 'amount'}
+
+
+def _affects_rollup(update_fields):
+    return update_fields is None or not ROLLUP_UPDATE_FIELDS.isdisjoint(update_fields)
+
+
+def expense_pre_save(sender, instance, raw, update_fields=None, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, 'saved_rollup_state') or not _affects_rollup(update_fields):
+        return
+    # Not loaded from the database (or loaded with deferred fields): read what it counts for now
+    instance.saved_rollup_state = (
+        Expense.objects.filter(pk=instance.pk).values_list(*Expense.ROLLUP_FIELDS).first()
+    )
+
+
+def expense_rollup_saved(sender, instance, created, raw, update_fields=None, **kwargs):
+    if raw or not _affects_rollup(update_fields):
+        return
+    previous = None if created else instance.saved_rollup_state
+    state = instance.rollup_state()
+    if state != previous:
+        apply_rollups(added=[state], removed=[previous] if previous else [], using=kwargs['using'])
+    instance.saved_rollup_state = state
+
+
+def expense_rollup_deleted(sender, instance, origin=None, **kwargs):
+    # ExpenseQuerySet.delete adjusts the rollups for queryset deletes, and deleting a category
+    # or user deletes its rollups by cascade, so only single-instance deletes are left
+    if isinstance(origin, Expense):
+        state = getattr(instance, 'saved_rollup_state', None) or instance.rollup_state()
+        apply_rollups(removed=[state], using=kwargs['using'])
+
+
+def user_changed(sender, instance, **kwargs):
+    # Sessions must see a new password hash, is_active flag or deletion
+    forget_user(instance.pk)
+
+
+def connect():
+    for model in TRACKED_MODELS:
+        post_save.connect(collection_changed, sender=model, dispatch_uid=f'collection-version-save-{model.__name__}')
+        post_delete.connect(collection_row_deleted, sender=model, dispatch_uid=f'collection-version-delete-{model.__name__}')
+    post_save.connect(finance_category_saved, sender=FinanceCategory, dispatch_uid='finance-category-touch-expenses')
+    pre_save.connect(expense_pre_save, sender=Expense, dispatch_uid='expense-rollup-pre-save')
+    post_save.connect(expense_rollup_saved, sender=Expense, dispatch_uid='expense-rollup-save')
+    post_delete.connect(expense_rollup_deleted, sender=Expense, dispatch_uid='expense-rollup-delete')
+    post_save.connect(user_changed, sender=get_user_model(), dispatch_uid='session-user-save')
+    post_delete.connect(user_changed, sender=get_user_model(), dispatch_uid='session-user-delete')
@@ -0,0 +1,53 @@
+"""Helpers for ``?since=<cursor>`` delta syncs.
+
+A cursor is an opaque, URL-safe encoding of the server time at which a response was
+built. ``updated_at`` is stamped when a row is saved, not when its transaction commits,
+so changes are read back from ``cursor - SYNC_OVERLAP_SECONDS``: a client may see a row
+twice, but never misses one written by a transaction that was still open.
+"""
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Tombstone
+
+
+def make_cursor(moment=None):
+    moment = moment or timezone.now()
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip('=')
+
+
+def parse_cursor(raw):
+    """Return the aware datetime encoded in ``raw``, or None if it is not a valid cursor."""
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return moment if timezone.is_aware(moment) else None
+
+
+def cursor_expired(moment):
+    """True when tombstones older than ``moment`` may already have been purged."""
+    return moment < timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+
+
+def changes_since(queryset, user, resource, moment, owned=None):
+    """Rows of ``queryset`` saved after ``moment`` and ids of ``resource`` rows deleted since.
+
+    ``owned`` is every row of the user when ``queryset`` is a filtered view of them (e.g.
+    active thoughts only): rows saved since that no longer match the filter are reported
+    as deleted too, so a client drops them from its copy of the view.
+    """
+    start = moment - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    deleted = set(
+        Tombstone.objects.filter(user=user, resource=resource, deleted_at__gte=start)
+        .values_list('object_id', flat=True)
+    )
+    changed = queryset.filter(updated_at__gte=start)
+    if owned is not None:
+        deleted.update(
+            owned.filter(updated_at__gte=start).exclude(pk__in=changed.values('pk')).values_list('pk', flat=True)
+        )
+    return changed, sorted(deleted)
@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     health,
+    bootstrap,
+    export,
+    metrics,
     HabitViewSet,
     ExpenseViewSet, 
     FinanceCategoryViewSet, 
@@ -13,7 +17,7 @@ from .views import (
     ThoughtViewSet,
     AchievementViewSet,
 )
-from .auth_views import register, login_view, logout_view, current_user, csrf_token
+from .auth_views import register, login_view, logout_view, current_user, csrf_token, token_view, token_refresh
 
 router = DefaultRouter()
 router.register('habits', HabitViewSet, basename='habit')
@@ -29,10 +33,21 @@ router.register('achievements', AchievementViewSet, basename='achievement')  # p
 
 urlpatterns = [
     path('health/', health, name='api-health'),
+    path('bootstrap/', bootstrap, name='bootstrap'),
+    path('export/', export, name='export'),
+    path('metrics/', metrics, name='metrics'),
     path('auth/register/', register, name='register'),
     path('auth/login/', login_view, name='login'),
     path('auth/logout/', logout_view, name='logout'),
     path('auth/user/', current_user, name='current-user'),
     path('auth/csrf/', csrf_token, name='csrf-token'),
+    path('auth/token/', token_view, name='token'),
+    path('auth/token/refresh/', token_refresh, name='token-refresh'),
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # Served by uvicorn (backend/asgi.py): async list/retrieve, health and auth/user
+    from .async_views import async_urlpatterns
+
+    urlpatterns = async_urlpatterns(urlpatterns)
@@ -0,0 +1,150 @@
+"""Read-only list rendering from ``values_list()`` rows.
+
+``ValuesListSerializer(queryset, serializer_class).data`` equals
+``serializer_class(queryset, many=True).data`` (same keys, order and values, so the same
+JSON) without building a model instance per row or running DRF's per-field attribute
+lookups. The columns behind the serializer's fields are read with one ``values_list()``
+query; a ``category.name`` source becomes a join, so related names cost no extra queries.
+Only fields whose representation differs from the database value (dates, datetimes,
+decimals, ...) are converted, by the serializer field itself.
+
+Fields that need a model instance (method fields, custom fields over reverse relations)
+cannot be read from columns: subclasses list them in ``computed_fields`` and fill them in,
+see ``HabitValuesSerializer``.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from .models import HabitCompletion
+from .serializers import current_streak
+
+# Fields whose representation is the database value for the columns they map to
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+)
+
+
+def _column(model, source_attrs):
+    """The ``values()`` lookup for a field source such as ``['category', 'name']``, or None."""
+    if not source_attrs:
+        return None
+    for position, attr in enumerate(source_attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        if field.is_relation and position < len(source_attrs) - 1:
+            model = field.related_model
+    return '__'.join(source_attrs)
+
+
+def _converter(field):
+    """None when the column value is already the field's representation."""
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values() returns the key itself rather than the related object
+        return None if field.pk_field is None else field.pk_field.to_representation
+    if isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    return field.to_representation
+
+
+class ValuesListSerializer:
+    computed_fields = ()
+
+    def __init__(self, queryset, serializer_class, context=None):
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.context = context or {}
+
+        model = queryset.model
+        fields = [field for field in serializer_class(context=self.context).fields.values() if not field.write_only]
+        # Every row starts as a copy of the template, so computed fields keep their position
+        self.template = dict.fromkeys(field.field_name for field in fields)
+        self.columns, self.names, self.conversions = [], [], []
+        for field in fields:
+            if field.field_name in self.computed_fields:
+                continue
+            column = None if isinstance(field, serializers.BaseSerializer) else _column(model, field.source_attrs)
+            if column is None:
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{field.field_name} is not a column; "
+                    f"add it to {type(self).__name__}.computed_fields"
+                )
+            convert = _converter(field)
+            if convert is not None:
+                self.conversions.append((field.field_name, len(self.columns), convert))
+            self.columns.append(column)
+            self.names.append(field.field_name)
+
+    def column(self, name):
+        """Position of ``name`` in each row, selecting it if no field did."""
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def rows(self):
+        # Prefetches would be thrown away: values() rows have nowhere to put them
+        return self.queryset.prefetch_related(None).values_list(*self.columns)
+
+    def to_representation(self, rows):
+        template, names, conversions = self.template, self.names, self.conversions
+        data = []
+        for row in rows:
+            item = template.copy()
+            item.update(zip(names, row))
+            for name, index, convert in conversions:
+                value = row[index]
+                if value is not None:
+                    item[name] = convert(value)
+            data.append(item)
+        return data
+
+    @property
+    def data(self):
+        return self.to_representation(list(self.rows()))
+
+    async def adata(self):
+        return self.to_representation([row async for row in self.rows()])
+
+
+class HabitValuesSerializer(ValuesListSerializer):
+    """Habits plus their completions: two queries, as with ``prefetch_related``."""
+
+    computed_fields = ('completed_by_date', 'current_streak')
+
+    def __init__(self, queryset, serializer_class, context=None):
+        super().__init__(queryset, serializer_class, context)
+        self.id_index = self.column('id')
+        self.streak_index = self.column('current_streak')
+        self.last_completed_index = self.column('last_completed')
+
+    def completions(self):
+        """``(habit_id, date)`` pairs, limited like the queryset's ``completions`` prefetch if it has one."""
+        completions = HabitCompletion.objects.all()
+        for lookup in self.queryset._prefetch_related_lookups:
+            if isinstance(lookup, Prefetch) and lookup.prefetch_to == 'completions' and lookup.queryset is not None:
+                completions = lookup.queryset
+        return completions.filter(habit__in=self.queryset.values('pk')).values_list('habit_id', 'date')
+
+    def to_representation(self, rows, completions=()):
+        dates = {}
+        for habit_id, day in completions:
+            dates.setdefault(habit_id, {})[day.isoformat()] = True
+        data = super().to_representation(rows)
+        for item, row in zip(data, rows):
+            item['completed_by_date'] = dates.get(row[self.id_index], {})
+            item['current_streak'] = current_streak(row[self.streak_index], row[self.last_completed_index])
+        return data
+
+    @property
+    def data(self):
+        rows = list(self.rows())
+        return self.to_representation(rows, self.completions() if rows else ())
+
+    async def adata(self):
+        rows = [row async for row in self.rows()]
+        completions = [pair async for pair in self.completions()] if rows else ()
+        return self.to_representation(rows, completions)
@@ -0,0 +1,147 @@
+"""Per-user collection version counters backing the list ETags.
+
+Every write to a tracked model bumps the ``CollectionVersion`` row of each collection
+whose list output it can change. Saves and deletes are picked up by the signal handlers
+in ``signals.py``; code paths that skip model signals (``bulk_create``, ``bulk_update``,
+``QuerySet.update``) must call :func:`mark_changed` themselves.
+
+Inside a transaction, bumps are deferred to ``transaction.on_commit`` and coalesced, so a
+cascade deleting hundreds of rows costs one UPDATE per collection, and a rolled back
+write never invalidates anything. Deletions are recorded the same way as ``Tombstone``
+rows (one bulk insert per transaction) for the ``?since=`` delta sync. Writes made in
+autocommit mode are already committed when the signal fires, so they are applied at once.
+"""
+import hashlib
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CollectionVersion, Tombstone
+
+# Router basenames of the collections a client can list
+COLLECTIONS = (
+    'habits', 'expenses', 'finance-categories', 'task-categories', 'tasks',
+    'notes', 'quadrants', 'quadrant-tasks', 'thoughts', 'achievements',
+)
+# Collections whose output depends on today's date (a habit's current streak lapses after a
+# missed day), so their tags and cached responses change at local midnight
+DATE_RELATIVE = {'habits'}
+
+
+class _PendingChanges:
+    """on_commit callback carrying the version bumps and tombstones of one transaction."""
+
+    def __init__(self):
+        self.keys = set()
+        self.tombstones = []
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        if self.tombstones:
+            record_tombstones(self.tombstones)
+        bump_versions(self.keys)
+
+
+def _pending_changes():
+    """The on_commit callback of the current transaction, registering one if needed."""
+    connection = transaction.get_connection()
+    # Callbacks of rolled back (save)points are dropped by Django together with their
+    # keys, so looking the pending callback up here can never pick up stale state
+    for _, callback, *_ in connection.run_on_commit:
+        if isinstance(callback, _PendingChanges) and not callback.done:
+            return callback
+    pending = _PendingChanges()
+    transaction.on_commit(pending)
+    return pending
+
+
+def mark_changed(user_id, *resources):
+    """Record that ``resources`` of ``user_id`` changed; bumped once the transaction commits."""
+    if user_id is None or not resources:
+        return
+    keys = {(user_id, resource) for resource in resources}
+    if not transaction.get_connection().in_atomic_block:
+        # Autocommit: the write is already committed (on_commit would run before we add keys)
+        bump_versions(keys)
+        return
+    _pending_changes().keys.update(keys)
+
+
+def mark_deleted(user_id, resource, object_id):
+    """Record a tombstone for a deleted row; written (in bulk) once the transaction commits."""
+    if user_id is None:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        record_tombstones([(user_id, resource, object_id)])
+        return
+    _pending_changes().tombstones.append((user_id, resource, object_id))
+
+
+def record_tombstones(tombstones):
+    deleted_at = timezone.now()
+    rows = [
+        Tombstone(user_id=user_id, resource=resource, object_id=object_id, deleted_at=deleted_at)
+        for user_id, resource, object_id in tombstones
+    ]
+    try:
+        # Runs after commit, in autocommit mode, so a failed insert needs no savepoint
+        Tombstone.objects.bulk_create(rows, batch_size=1000)
+    except IntegrityError:
+        # Rows of a deleted user: nobody is left to sync them
+        existing = set(User.objects.filter(id__in={row.user_id for row in rows}).values_list('id', flat=True))
+        Tombstone.objects.bulk_create([row for row in rows if row.user_id in existing], batch_size=1000)
+
+
+def bump_versions(keys):
+    """Increment the version of every (user_id, resource) pair, creating missing rows."""
+    for user_id, resource in sorted(keys):
+        updated = CollectionVersion.objects.filter(user_id=user_id, resource=resource).update(version=F('version') + 1)
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                CollectionVersion.objects.create(user_id=user_id, resource=resource, version=1)
+        except IntegrityError:
+            # Either a concurrent request created the row first, or the user itself was
+            # just deleted (its versions went with it)
+            CollectionVersion.objects.filter(user_id=user_id, resource=resource).update(version=F('version') + 1)
+
+
+def get_versions(user, resources):
+    """Return ``{resource: version}`` for ``resources``; collections never written are 0."""
+    versions = dict.fromkeys(resources, 0)
+    versions.update(
+        CollectionVersion.objects.filter(user=user, resource__in=resources).values_list('resource', 'version')
+    )
+    return versions
+
+
+async def aget_versions(user, resources):
+    """Async ORM variant of :func:`get_versions` for the ASGI read views."""
+    versions = dict.fromkeys(resources, 0)
+    queryset = CollectionVersion.objects.filter(user=user, resource__in=resources).values_list('resource', 'version')
+    async for resource, version in queryset:
+        versions[resource] = version
+    return versions
+
+
+def make_etag(user, versions, request, representation=None):
+    """Strong ETag for a response built from ``versions`` for the exact URL requested.
+
+    The path and query string are part of the tag because filters, date ranges and
+    cursors select different representations of the same collection version. Views whose
+    parameters are relative to today (``?span=month``) pass the resolved ``representation``
+    instead. The response cache stores entries under this tag, so the date also expires
+    cached habits.
+    """
+    if representation is None:
+        representation = request.get_full_path()
+    # date_joined tells apart users that reuse the primary key of a deleted account
+    parts = [str(user.pk), user.date_joined.isoformat(), representation, request.headers.get('Accept', '')]
+    parts += [f'{resource}={version}' for resource, version in sorted(versions.items())]
+    if not DATE_RELATIVE.isdisjoint(versions):
+        parts.append(timezone.localdate().isoformat())
+    return '"%s"' % hashlib.sha1('\n'.join(parts).encode()).hexdigest()
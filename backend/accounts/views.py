@@ -1,44 +1,177 @@
-from django.http import JsonResponse
+import hmac
+import json
+import logging
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, Min, OuterRef, Prefetch, Q, Subquery, Sum
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from .models import Habit, Expense, FinanceCategory,Task, TaskCategory, Note, Quadrant, QuadrantTask, Thought, Achievement
+from . import importers
+from .budgets import apply_rollups
+from .export import ablocks, blocks, csv_lines, ndjson_lines
+from .metrics import registry
+from .mixins import BulkModelMixin, ConditionalListMixin, etag_matches
+from .pagination import SearchResultsPagination
+from .response_cache import get_response_data, set_response_data
+from .search import search_notes
+from .models import BudgetRollup, Habit, HabitCompletion, Expense, ExpenseImport, FinanceCategory,Task, TaskCategory, Note, Quadrant, QuadrantTask, Thought, Achievement
+from .versioning import COLLECTIONS, get_versions, make_etag, mark_changed
 from .serializers import (
-    HabitSerializer, ExpenseSerializer, FinanceCategorySerializer, TaskCategorySerializer,
+    HabitSerializer, HabitStatsSerializer, HabitToggleSerializer, ExpenseSerializer, ExpenseImportSerializer, FinanceCategorySerializer, TaskCategorySerializer,
     TaskSerializer, NoteSerializer,
     QuadrantSerializer, QuadrantTaskSerializer,
     ThoughtSerializer, AchievementSerializer,
 )
+from .values_serializers import HabitValuesSerializer, ValuesListSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_day(raw):
+    """Parse a YYYY-MM-DD string, returning None for missing or invalid input."""
+    try:
+        return parse_date(str(raw)) if raw else None
+    except ValueError:
+        return None
 
-def health(request):
-    return JsonResponse({
-        "status": "ok",
-        "app": "django-backend",
-    })
 
+HEALTH = {
+    "status": "ok",
+    "app": "django-backend",
+}
 
-class HabitViewSet(viewsets.ModelViewSet):
+
+def health(request):
+    return JsonResponse(HEALTH)
+
+
+def metrics(request):
+    """Prometheus scrape endpoint for the per-view request metrics.
+
+    Open to staff users, or to any client sending ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        authorized = True
+    else:
+        authorized = request.user.is_staff
+    if not authorized:
+        return JsonResponse({'error': 'Forbidden'}, status=403)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson; charset=utf-8'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+}
+
+
+def export(request):
+    """Stream every row the user owns as NDJSON (default) or sectioned CSV.
+
+    Query params: ``format`` (ndjson|csv). Rows are read in chunks, so memory stays flat
+    regardless of account size.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"detail": "Authentication required"}, status=401)
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"error": f"'format' must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    lines, content_type = EXPORT_FORMATS[export_format]
+    content = blocks(lines(request.user))
+    if isinstance(request, ASGIRequest):
+        # Django reads a sync stream into a list before sending it under ASGI
+        content = ablocks(content)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    filename = f"dailyforge-{request.user.username}-{timezone.localdate().isoformat()}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def bootstrap(request):
+    """Return every collection the frontend loads at startup in a single response.
+
+    Each collection is one ``values()`` query (plus one for habit completions), instead of a
+    request each.
+    The ETag covers the versions of all collections, so an unchanged account is a 304
+    (or a response cache hit for clients without the tag).
+    """
+    if not request.user.is_authenticated:
+        return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    user = request.user
+    etag = make_etag(user, get_versions(user, COLLECTIONS), request)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    data = get_response_data('bootstrap', etag)
+    if data is not None:
+        return Response(data, headers=headers)
+
+    collections = {
+        'habits': (Habit.objects.filter(user=user), HabitSerializer, HabitValuesSerializer),
+        'expenses': (Expense.objects.filter(user=user), ExpenseSerializer, ValuesListSerializer),
+        'finance_categories': (FinanceCategory.objects.filter(user=user), FinanceCategorySerializer, ValuesListSerializer),
+        'task_categories': (TaskCategory.objects.filter(user=user), TaskCategorySerializer, ValuesListSerializer),
+        'tasks': (Task.objects.filter(user=user), TaskSerializer, ValuesListSerializer),
+        'notes': (Note.objects.filter(user=user), NoteSerializer, ValuesListSerializer),
+        'quadrants': (Quadrant.objects.filter(user=user), QuadrantSerializer, ValuesListSerializer),
+        'quadrant_tasks': (QuadrantTask.objects.filter(user=user), QuadrantTaskSerializer, ValuesListSerializer),
+        'thoughts': (Thought.objects.filter(user=user, is_active=True), ThoughtSerializer, ValuesListSerializer),
+        'achievements': (Achievement.objects.filter(user=user), AchievementSerializer, ValuesListSerializer),
+    }
+    data = {
+        name: values_serializer(queryset, serializer).data
+        for name, (queryset, serializer, values_serializer) in collections.items()
+    }
+    set_response_data(etag, data)
+    return Response(data, headers=headers)
+
+
+class HabitViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = HabitSerializer
+    values_serializer_class = HabitValuesSerializer
+    collection = 'habits'
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        print(f"HabitViewSet.get_queryset: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             qs = Habit.objects.filter(user=self.request.user)
-            print(f"  -> returning {qs.count()} habits for user {self.request.user.username}")
+            if self.action == 'list':
+                qs = qs.prefetch_related(self._completions_prefetch())
             return qs
-        print("  -> user not authenticated, returning empty queryset")
         return Habit.objects.none()
+
+    def _completions_prefetch(self):
+        """Load completions with one (habit, date) index scan, optionally limited to ?from=&to=."""
+        completions = HabitCompletion.objects.all()
+        start = _parse_day(self.request.query_params.get('from'))
+        end = _parse_day(self.request.query_params.get('to'))
+        if start:
+            completions = completions.filter(date__gte=start)
+        if end:
+            completions = completions.filter(date__lte=end)
+        return Prefetch('completions', queryset=completions)
     
     def perform_create(self, serializer):
-        print(f"HabitViewSet.perform_create: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
-            print(f"  -> habit saved for user {self.request.user.username}")
         else:
-            print("  -> user not authenticated, cannot save habit")
             raise PermissionError("User not authenticated")
 
     @action(detail=True, methods=['post'], url_path='toggle')
@@ -47,21 +180,17 @@ class HabitViewSet(viewsets.ModelViewSet):
 
         Expects JSON body: {"date": "YYYY-MM-DD", "value": true/false}
         """
-        print("📥 HabitViewSet.toggle: entered")
-        print(f"  user={request.user}, is_authenticated={request.user.is_authenticated}")
-        print(f"  data={request.data}")
-
         if not request.user.is_authenticated:
-            print("  -> user not authenticated in toggle")
             return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
 
         habit = self.get_object()
-        print(f"  -> toggling habit id={habit.id}, name={habit.name}, owner={habit.user}")
 
-        date = request.data.get('date')
-        if not date:
-            print("  -> missing 'date' in request body")
+        raw_date = request.data.get('date')
+        if not raw_date:
             return Response({"error": "'date' is required"}, status=status.HTTP_400_BAD_REQUEST)
+        date = _parse_day(raw_date)
+        if date is None:
+            return Response({"error": "'date' must be a YYYY-MM-DD date"}, status=status.HTTP_400_BAD_REQUEST)
 
         raw_value = request.data.get('value', True)
         # Coerce to boolean if coming as string
@@ -69,169 +198,518 @@ class HabitViewSet(viewsets.ModelViewSet):
         if isinstance(raw_value, str):
             value = raw_value.lower() in ['1', 'true', 'yes', 'on']
 
-        print(f"  -> date={date}, value(raw)={raw_value}, value(bool)={value}")
+        # Single-row INSERT/DELETE instead of rewriting the whole history
+        habit.set_completed(date, bool(value))
+        logger.debug("habit toggled habit=%s date=%s value=%s", habit.id, date, bool(value))
 
-        data = habit.completed_by_date or {}
-        print("  -> current completed_by_date:", data)
+        return Response(self.get_serializer(habit).data)
 
-        if value:
-            data[date] = True
-        else:
-            if date in data:
-                del data[date]
 
-        habit.completed_by_date = data
-        habit.save()
-        print("  -> updated completed_by_date:", habit.completed_by_date)
+    MAX_BATCH_OPERATIONS = 1000
 
-        serializer = self.get_serializer(habit)
-        response_data = serializer.data
-        print("📤 HabitViewSet.toggle: returning serialized habit:", response_data)
-        return Response(response_data)
+    @action(detail=False, methods=['post'], url_path='toggle-batch')
+    def toggle_batch(self, request):
+        """Apply many completion changes in one transaction.
 
+        Expects JSON body: {"operations": [{"habit": 1, "date": "YYYY-MM-DD", "value": true}, ...]}
+        (a bare list is accepted too). Later operations on the same habit/day win.
+        Returns the updated counters of every touched habit.
+        """
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+        payload = request.data.get('operations') if isinstance(request.data, dict) else request.data
+        if not isinstance(payload, list) or not payload:
+            return Response({"error": "'operations' must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > self.MAX_BATCH_OPERATIONS:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH_OPERATIONS} operations per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        operations = HabitToggleSerializer(data=payload, many=True)
+        if not operations.is_valid():
+            return Response({"operations": operations.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        wanted = {}
+        for op in operations.validated_data:
+            wanted[(op['habit'], op['date'])] = op['value']
+        habit_ids = sorted({habit_id for habit_id, _ in wanted})
+
+        with transaction.atomic():
+            # One lock per habit, taken in id order so concurrent batches cannot deadlock
+            habits = list(
+                Habit.objects.select_for_update()
+                .filter(user=request.user, id__in=habit_ids)
+                .order_by('id')
+            )
+            missing = set(habit_ids) - {habit.id for habit in habits}
+            if missing:
+                return Response(
+                    {"error": f"Unknown habit ids: {sorted(missing)}"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            days = {day for _, day in wanted}
+            existing = {
+                (habit_id, day): pk
+                for pk, habit_id, day in HabitCompletion.objects.filter(
+                    habit_id__in=habit_ids, date__in=days
+                ).values_list('id', 'habit_id', 'date')
+            }
+
+            to_create = [
+                HabitCompletion(habit_id=habit_id, date=day)
+                for (habit_id, day), value in wanted.items()
+                if value and (habit_id, day) not in existing
+            ]
+            to_delete = [existing[key] for key, value in wanted.items() if not value and key in existing]
+
+            HabitCompletion.objects.bulk_create(to_create)
+            if to_delete:
+                HabitCompletion.objects.filter(id__in=to_delete).delete()
+
+            # Recount only the runs around the changed days, read with one query for all habits
+            added = {habit.id: set() for habit in habits}
+            removed = {habit.id: set() for habit in habits}
+            for completion in to_create:
+                added[completion.habit_id].add(completion.date)
+            for (habit_id, day), value in wanted.items():
+                if not value and (habit_id, day) in existing:
+                    removed[habit_id].add(day)
+            changed = [habit for habit in habits if added[habit.id] or removed[habit.id]]
+            windows = Q(pk__in=[])
+            for habit in changed:
+                windows |= Q(habit_id=habit.id, date__range=habit.stats_window(added[habit.id] | removed[habit.id]))
+            window_dates = {habit.id: [] for habit in changed}
+            rows = HabitCompletion.objects.filter(windows).order_by('habit_id', 'date').values_list('habit_id', 'date')
+            for habit_id, day in rows.iterator(chunk_size=2000):
+                window_dates[habit_id].append(day)
+            now = timezone.now()
+            for habit in changed:
+                habit.apply_completion_changes(added[habit.id], removed[habit.id], window_dates[habit.id])
+            for habit in habits:
+                habit.updated_at = now
+            Habit.objects.bulk_update(habits, [*Habit.STATS_FIELDS, 'updated_at'])
+            mark_changed(request.user.id, self.collection)
+
+        return Response({
+            "applied": len(to_create) + len(to_delete),
+            "habits": HabitStatsSerializer(habits, many=True).data,
+        })
+
+def _week_start(day):
+    """Sunday on or before ``day``; weeks start on Sunday, like Date.getDay() on the frontend."""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def _span_bounds(span, today):
+    """Return the (start, end) dates covered by a span, mirroring the client's filterBySpan."""
+    if span == 'week':
+        start = _week_start(today)
+        return start, start + timedelta(days=6)
+    if span == 'month':
+        start = today.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    if span == 'year':
+        return today.replace(month=1, day=1), today.replace(month=12, day=31)
+    return None, None
+
+
+def _money(value):
+    """Format an aggregated amount the same way DRF renders DecimalFields."""
+    return str(Decimal(value or 0).quantize(Decimal('0.01')))
+
+
+class ExpenseViewSet(BulkModelMixin, ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
+    collection = 'expenses'
     permission_classes = [AllowAny]
+
+    SUMMARY_SPANS = ('week', 'month', 'year', 'all')
     
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return Expense.objects.filter(user=self.request.user)
+            return Expense.objects.filter(user=self.request.user).select_related('category')
         return Expense.objects.none()
     
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
 
+    def get_bulk_update_queryset(self):
+        # ExpenseSerializer reschedules edited rules after their last copy
+        last_occurrence = Expense.objects.filter(recurrence_source=OuterRef('pk')).order_by('-date').values('date')[:1]
+        return super().get_bulk_update_queryset().annotate(last_occurrence=Subquery(last_occurrence))
+
+    def perform_bulk_create(self, objects):
+        with transaction.atomic(savepoint=False):
+            super().perform_bulk_create(objects)
+            apply_rollups(added=[expense.rollup_state() for expense in objects])
+
+    def perform_bulk_update(self, instances, fields):
+        with transaction.atomic(savepoint=False):
+            super().perform_bulk_update(instances, fields)
+            apply_rollups(
+                added=[expense.rollup_state() for expense in instances],
+                removed=[expense.saved_rollup_state for expense in instances],
+            )
+
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request):
+        """Aggregate the user's expenses in the database.
+
+        Query params: ``span`` (week|month|year|all, default all) and/or explicit
+        ``from``/``to`` dates (YYYY-MM-DD) which take precedence over the span.
+        Negative amounts are spending and positive amounts are income, as on the client.
+        Answers 304 for a matching ``If-None-Match`` and reuses cached results until an
+        expense or category changes.
+        """
+        span = request.query_params.get('span', 'all')
+        if span not in self.SUMMARY_SPANS:
+            return Response(
+                {"error": f"'span' must be one of {', '.join(self.SUMMARY_SPANS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        start, end = _span_bounds(span, timezone.localdate())
+
+        for param in ('from', 'to'):
+            raw = request.query_params.get(param)
+            if not raw:
+                continue
+            parsed = _parse_day(raw)
+            if parsed is None:
+                return Response({"error": f"'{param}' must be a YYYY-MM-DD date"}, status=status.HTTP_400_BAD_REQUEST)
+            if param == 'from':
+                start = parsed
+            else:
+                end = parsed
+
+        # Expenses embed their category's name; the tag names the resolved range, so a span
+        # moves on with the calendar while equivalent queries share one cached result
+        representation = f'{request.path}?span={span}&from={start or ""}&to={end or ""}'
+        etag = make_etag(
+            request.user, get_versions(request.user, [self.collection, 'finance-categories']), request, representation,
+        )
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        data = get_response_data('expense-summary', etag)
+        if data is not None:
+            return Response(data, headers=headers)
+
+        queryset = self.get_queryset()
+        if start:
+            queryset = queryset.filter(date__gte=start)
+        if end:
+            queryset = queryset.filter(date__lte=end)
+        # Drop the default ordering so the GROUP BY only contains the grouped columns
+        queryset = queryset.order_by()
+
+        spending = Q(amount__lt=0)
+        income = Q(amount__gt=0)
+        totals = queryset.aggregate(
+            count=Count('id'),
+            spend_total=Sum('amount', filter=spending),
+            spend_count=Count('id', filter=spending),
+            spend_avg=Avg('amount', filter=spending),
+            spend_max=Min('amount', filter=spending),
+            income_total=Sum('amount', filter=income),
+            income_count=Count('id', filter=income),
+        )
+        per_category = (
+            queryset.values('category_id', 'category__name')
+            .annotate(
+                count=Count('id'),
+                spend_total=Sum('amount', filter=spending),
+                spend_count=Count('id', filter=spending),
+                spend_avg=Avg('amount', filter=spending),
+                spend_max=Min('amount', filter=spending),
+                income_total=Sum('amount', filter=income),
+            )
+            .order_by('category__name', 'category_id')
+        )
+
+        data = {
+            'span': span,
+            'from': start.isoformat() if start else None,
+            'to': end.isoformat() if end else None,
+            'count': totals['count'],
+            'spent': _money(-(totals['spend_total'] or 0)),
+            'spend_count': totals['spend_count'],
+            'average_spend': _money(-(totals['spend_avg'] or 0)),
+            'max_spend': _money(-(totals['spend_max'] or 0)),
+            'income': _money(totals['income_total']),
+            'income_count': totals['income_count'],
+            'net': _money((totals['income_total'] or 0) + (totals['spend_total'] or 0)),
+            'categories': [
+                {
+                    'id': row['category_id'],
+                    'name': row['category__name'],
+                    'count': row['count'],
+                    'spent': _money(-(row['spend_total'] or 0)),
+                    'spend_count': row['spend_count'],
+                    'average_spend': _money(-(row['spend_avg'] or 0)),
+                    'max_spend': _money(-(row['spend_max'] or 0)),
+                    'income': _money(row['income_total']),
+                }
+                for row in per_category
+            ],
+        }
+        set_response_data(etag, data)
+        return Response(data, headers=headers)
+
+    @action(detail=False, methods=['get', 'post'], url_path='import', url_name='import')
+    def import_statement(self, request):
+        """Upload a CSV or OFX bank statement (GET lists the user's recent imports).
+
+        Multipart fields: ``file``, optional ``format`` (csv|ofx, default from the file
+        name), ``rules`` (JSON list of {"match": "text in title", "category": "name"}),
+        ``default_category`` and ``date_format`` (strptime pattern for CSV dates).
+        Answers 202 with the import job; poll ``import/<id>/`` for progress.
+        """
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        if request.method == 'GET':
+            importers.fail_stale_imports(request.user)
+            jobs = ExpenseImport.objects.filter(user=request.user)[:20]
+            return Response(ExpenseImportSerializer(jobs, many=True).data)
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the statement as the 'file' field"}, status=status.HTTP_400_BAD_REQUEST)
+        if upload.size > settings.EXPENSE_IMPORT_MAX_MB * 1024 * 1024:
+            return Response(
+                {"error": f"File is larger than {settings.EXPENSE_IMPORT_MAX_MB} MB"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        statement_format = request.data.get('format') or (
+            'ofx' if upload.name.lower().endswith(('.ofx', '.qfx')) else 'csv'
+        )
+        if statement_format not in importers.PARSERS:
+            return Response(
+                {"error": f"'format' must be one of {', '.join(importers.PARSERS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            rules = json.loads(request.data.get('rules') or '[]')
+        except ValueError:
+            rules = None
+        if not isinstance(rules, list) or not all(
+            isinstance(rule, dict) and isinstance(rule.get('match'), str) and rule['match']
+            and isinstance(rule.get('category'), str) and rule['category']
+            for rule in rules
+        ):
+            return Response(
+                {"error": "'rules' must be a JSON list of {\"match\": ..., \"category\": ...} objects"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # The upload's own temporary file is removed when the request ends, so the
+        # background import reads from a copy
+        with tempfile.NamedTemporaryFile(prefix='dailyforge-import-', delete=False) as copy:
+            for chunk in upload.chunks():
+                copy.write(chunk)
+        job = ExpenseImport.objects.create(
+            user=request.user, filename=upload.name[:255], format=statement_format, size=upload.size,
+        )
+        importers.start_import(
+            job, copy.name, rules=rules,
+            default_category=request.data.get('default_category') or None,
+            date_format=request.data.get('date_format') or None,
+        )
+        job.refresh_from_db()
+        return Response(ExpenseImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'import/(?P<import_id>\d+)', url_name='import-status')
+    def import_status(self, request, import_id=None):
+        """Progress of one statement import."""
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        importers.fail_stale_imports(request.user)
+        job = ExpenseImport.objects.filter(user=request.user, pk=import_id).first()
+        if job is None:
+            return Response({"error": "Import not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ExpenseImportSerializer(job).data)
 
 
 
-class FinanceCategoryViewSet(viewsets.ModelViewSet):
+
+class FinanceCategoryViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = FinanceCategorySerializer
+    collection = 'finance-categories'
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        print(f"FinanceCategoryViewSet.get_queryset: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             return FinanceCategory.objects.filter(user=self.request.user)
         return FinanceCategory.objects.none()
     
     def perform_create(self, serializer):
-        print(f"FinanceCategoryViewSet.perform_create: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
             raise PermissionError("User not authenticated")
 
-class TaskCategoryViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='budget-status')
+    def budget_status(self, request):
+        """Budget, spending and income of every category for one month.
+
+        Query param: ``month`` (YYYY-MM, default the current month). Reads one rollup row
+        per category, so the cost does not depend on the length of the expense history.
+        """
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        raw = request.query_params.get('month')
+        month = _parse_day(f'{raw}-01') if raw else timezone.localdate().replace(day=1)
+        if month is None:
+            return Response({"error": "'month' must be YYYY-MM"}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = make_etag(request.user, get_versions(request.user, [self.collection, 'expenses']), request)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        rollups = {
+            rollup.category_id: rollup
+            for rollup in BudgetRollup.objects.filter(user=request.user, month=month)
+        }
+        categories, totals = [], {'budget': Decimal(0), 'spent': Decimal(0), 'income': Decimal(0)}
+        for category in self.get_queryset().order_by('name', 'id'):
+            rollup = rollups.get(category.id)
+            spent = rollup.spent if rollup else Decimal(0)
+            income = rollup.income if rollup else Decimal(0)
+            totals['budget'] += category.budget
+            totals['spent'] += spent
+            totals['income'] += income
+            categories.append({
+                'id': category.id,
+                'name': category.name,
+                'color': category.color,
+                'budget': _money(category.budget),
+                'spent': _money(spent),
+                'income': _money(income),
+                'count': rollup.count if rollup else 0,
+                'remaining': _money(category.budget - spent),
+                'utilization': round(float(spent / category.budget), 4) if category.budget > 0 else None,
+            })
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'budget': _money(totals['budget']),
+            'spent': _money(totals['spent']),
+            'income': _money(totals['income']),
+            'remaining': _money(totals['budget'] - totals['spent']),
+            'categories': categories,
+        }, headers=headers)
+
+class TaskCategoryViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = TaskCategorySerializer
+    collection = 'task-categories'
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        print(f"TaskCategoryViewSet.get_queryset: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             return TaskCategory.objects.filter(user=self.request.user)
         return TaskCategory.objects.none()      
     def perform_create(self, serializer):
-        print(f"TaskCategoryViewSet.perform_create: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
             raise PermissionError("User not authenticated")
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(BulkModelMixin, ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
+    collection = 'tasks'
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        print(f"TaskViewSet.get_queryset: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             return Task.objects.filter(user=self.request.user)
         return Task.objects.none()
     
     def perform_create(self, serializer):
-        print(f"TaskViewSet.perform_create: user={self.request.user}, is_authenticated={self.request.user.is_authenticated}")
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
             raise PermissionError("User not authenticated")
-    
-    def create(self, request, *args, **kwargs):
-        print("TaskViewSet.create: Received data:", request.data)
-        return super().create(request, *args, **kwargs)
 
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     serializer_class = NoteSerializer
+    collection = 'notes'
     permission_classes = [AllowAny]
     
     def get_queryset(self):
-        if self.request.user.is_authenticated:
-            return Note.objects.filter(user=self.request.user)
-        return Note.objects.none()
+        if not self.request.user.is_authenticated:
+            return Note.objects.none()
+
+        queryset = Note.objects.filter(user=self.request.user).defer('search_vector')
+        if self.action != 'list':
+            return queryset
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+        text = self.request.query_params.get('q', '').strip()
+        if text:
+            queryset = search_notes(queryset, text)
+        return queryset
+
+    @property
+    def paginator(self):
+        """Search results (``?q=``) are always paginated, 20 per page by default."""
+        if not hasattr(self, '_paginator') and self.request.query_params.get('q', '').strip():
+            self._paginator = SearchResultsPagination()
+        return super().paginator
     
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
 
 
-class QuadrantViewSet(viewsets.ModelViewSet):
+class QuadrantViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """CRUD for per-user quadrant configurations (metadata), not tasks."""
 
     serializer_class = QuadrantSerializer
+    collection = 'quadrants'
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        print(
-            f"QuadrantViewSet.get_queryset: user={self.request.user}, "
-            f"is_authenticated={self.request.user.is_authenticated}"
-        )
         if self.request.user.is_authenticated:
             return Quadrant.objects.filter(user=self.request.user)
         return Quadrant.objects.none()
 
     def perform_create(self, serializer):
-        print(
-            f"QuadrantViewSet.perform_create: user={self.request.user}, "
-            f"is_authenticated={self.request.user.is_authenticated}"
-        )
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
             raise PermissionError("User not authenticated")
 
 
-class QuadrantTaskViewSet(viewsets.ModelViewSet):
+class QuadrantTaskViewSet(BulkModelMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet for Eisenhower quadrant tasks, separate from Category/Task used by Todo."""
 
     serializer_class = QuadrantTaskSerializer
+    collection = 'quadrant-tasks'
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        print(
-            f"QuadrantTaskViewSet.get_queryset: user={self.request.user}, "
-            f"is_authenticated={self.request.user.is_authenticated}"
-        )
         if self.request.user.is_authenticated:
             return QuadrantTask.objects.filter(user=self.request.user)
         return QuadrantTask.objects.none()
 
     def perform_create(self, serializer):
-        print(
-            f"QuadrantTaskViewSet.perform_create: user={self.request.user}, "
-            f"is_authenticated={self.request.user.is_authenticated}"
-        )
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
         else:
             raise PermissionError("User not authenticated")
 
 
-class ThoughtViewSet(viewsets.ModelViewSet):
+class ThoughtViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """CRUD for banner thoughts."""
 
     serializer_class = ThoughtSerializer
+    collection = 'thoughts'
     permission_classes = [AllowAny]
 
     def get_queryset(self):
@@ -258,12 +736,19 @@ class ThoughtViewSet(viewsets.ModelViewSet):
             raise PermissionError("User not authenticated")
 
 
-class AchievementViewSet(viewsets.ModelViewSet):
-    """CRUD for user achievements with calendar filtering client-side."""
+class AchievementViewSet(ConditionalListMixin, viewsets.ModelViewSet):
+    """CRUD for user achievements, plus per-day/week/month counts for the calendar."""
 
     serializer_class = AchievementSerializer
+    collection = 'achievements'
     permission_classes = [AllowAny]
 
+    CALENDAR_GROUPS = {
+        'day': lambda day: day,
+        'week': _week_start,
+        'month': lambda day: day.replace(day=1),
+    }
+
     def get_queryset(self):
         if not self.request.user.is_authenticated:
             return Achievement.objects.none()
@@ -274,6 +759,72 @@ class AchievementViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(date_earned=date_param)
         return queryset
 
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        """Achievement counts per day, week (starting Sunday) or month, for a heatmap.
+
+        Query params: ``from``/``to`` (YYYY-MM-DD, default the last 365 days), ``group``
+        (day|week|month, default day) and ``categories=1`` for a per-category breakdown.
+        One GROUP BY over the (user, date_earned) index; only non-empty buckets are returned.
+        """
+        if not request.user.is_authenticated:
+            return Response({"detail": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        group = request.query_params.get('group', 'day')
+        if group not in self.CALENDAR_GROUPS:
+            return Response(
+                {"error": f"'group' must be one of {', '.join(self.CALENDAR_GROUPS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        end = timezone.localdate()
+        start = end - timedelta(days=364)
+        for param in ('from', 'to'):
+            raw = request.query_params.get(param)
+            if not raw:
+                continue
+            parsed = _parse_day(raw)
+            if parsed is None:
+                return Response({"error": f"'{param}' must be a YYYY-MM-DD date"}, status=status.HTTP_400_BAD_REQUEST)
+            if param == 'from':
+                start = parsed
+            else:
+                end = parsed
+        if start > end:
+            return Response({"error": "'from' must not be after 'to'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = make_etag(request.user, get_versions(request.user, [self.collection]), request)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        with_categories = request.query_params.get('categories', '').lower() in ['1', 'true', 'yes', 'on']
+        columns = ['date_earned', 'category'] if with_categories else ['date_earned']
+        rows = (
+            self.get_queryset()
+            .filter(date_earned__range=(start, end))
+            .values(*columns)
+            .annotate(count=Count('id'))
+            .order_by(*columns)
+        )
+
+        bucket_of = self.CALENDAR_GROUPS[group]
+        buckets = {}
+        for row in rows:
+            key = bucket_of(row['date_earned'])
+            bucket = buckets.setdefault(key, {'start': key.isoformat(), 'count': 0})
+            bucket['count'] += row['count']
+            if with_categories:
+                categories = bucket.setdefault('categories', {})
+                categories[row['category']] = categories.get(row['category'], 0) + row['count']
+
+        return Response({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'group': group,
+            'total': sum(bucket['count'] for bucket in buckets.values()),
+            'buckets': list(buckets.values()),
+        }, headers=headers)
+
     def perform_create(self, serializer):
         if self.request.user.is_authenticated:
             serializer.save(user=self.request.user)
@@ -13,5 +13,14 @@ os.environ.setdefault(
     "DJANGO_SETTINGS_MODULE",
     "backend.settings"
 )
+# Serve the hot reads with the async views in accounts/async_views.py
+os.environ.setdefault("ASYNC_READ_VIEWS", "true")
+# Requests run in many short-lived threads under ASGI: share pooled connections instead
+os.environ.setdefault("DB_POOL", "true")
 
 application = get_asgi_application()
+
+from backend.static_assets import StaticAssetsASGI  # noqa: E402
+
+# Answer /assets/ from memory before Django runs
+application = StaticAssetsASGI(application)
@@ -0,0 +1,157 @@
+"""Serves the Vite build in ``dist/`` without going through Django.
+
+``/assets/<file>`` requests are answered by the WSGI/ASGI wrappers below (applied in
+``wsgi.py`` and ``asgi.py``) before any middleware, URL resolution or database work runs.
+Every asset is read into memory once, together with the ``.br``/``.gz`` copies written next
+to it at build time (see ``precompress`` in vite.config.js), and each request gets the
+smallest encoding its ``Accept-Encoding`` allows. Vite puts a content hash in every asset
+name, so those responses may be cached by browsers for a year as ``immutable``.
+
+``index.html`` is kept in memory too and returned by :func:`spa_index` for every client-side
+route, revalidated on each use so a deploy is picked up immediately.
+
+Files are read when the process starts; restart the server after rebuilding the frontend.
+"""
+import functools
+import hashlib
+import mimetypes
+import re
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+from django.utils.http import parse_etags
+from django.views.decorators.http import etag, require_safe
+
+from accounts.compression import accepted_encodings
+
+ASSETS_PREFIX = '/assets/'
+# Vite asset names end in a content hash, e.g. index-0d7af9cd.js
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8,}\.\w+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=0, must-revalidate'
+# Precompressed variants, most preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+
+class Asset:
+    """One built file and its precompressed variants, held in memory."""
+
+    def __init__(self, path):
+        self.bodies = {'identity': path.read_bytes()}
+        for encoding, suffix in ENCODINGS:
+            compressed = path.with_name(path.name + suffix)
+            if compressed.is_file():
+                self.bodies[encoding] = compressed.read_bytes()
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith(TEXT_TYPES):
+            content_type += '; charset=utf-8'
+        self.content_type = content_type
+        self.cache_control = IMMUTABLE if HASHED_NAME.search(path.name) else REVALIDATE
+        self.digest = hashlib.sha1(self.bodies['identity']).hexdigest()[:20]
+
+    def respond(self, accept_encoding, if_none_match, head=False):
+        """``(status, headers, body)`` for a GET or HEAD of this asset."""
+        accepted = accepted_encodings(accept_encoding)
+        encoding = next(
+            (encoding for encoding, _ in ENCODINGS if encoding in self.bodies and encoding in accepted),
+            'identity',
+        )
+        # Each encoding is a different representation, so it needs its own strong ETag
+        tag = f'"{self.digest}"' if encoding == 'identity' else f'"{self.digest}-{encoding}"'
+        headers = [
+            ('Content-Type', self.content_type),
+            ('Cache-Control', self.cache_control),
+            ('Vary', 'Accept-Encoding'),
+            ('ETag', tag),
+            ('X-Content-Type-Options', 'nosniff'),
+        ]
+        if if_none_match and tag in {value.removeprefix('W/') for value in parse_etags(if_none_match)}:
+            return 304, headers, b''
+        body = self.bodies[encoding]
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        headers.append(('Content-Length', str(len(body))))
+        return 200, headers, b'' if head else body
+
+
+def load_assets(directory):
+    """``{url path: Asset}`` for every file under ``directory`` (empty if it does not exist)."""
+    if not directory.is_dir():
+        return {}
+    return {
+        ASSETS_PREFIX + path.relative_to(directory).as_posix(): Asset(path)
+        for path in sorted(directory.rglob('*'))
+        if path.is_file() and path.suffix not in {suffix for _, suffix in ENCODINGS}
+    }
+
+
+class StaticAssets:
+    def __init__(self, application, directory=None):
+        self.application = application
+        self.assets = load_assets(directory or settings.FRONTEND_DIST_DIR / 'assets')
+
+    def serve(self, path, method, accept_encoding, if_none_match):
+        if method not in ('GET', 'HEAD'):
+            return 405, [('Allow', 'GET, HEAD'), ('Content-Length', '0')], b''
+        asset = self.assets.get(path)
+        if asset is None:
+            body = b'Not Found'
+            return 404, [('Content-Type', 'text/plain; charset=utf-8'), ('Content-Length', str(len(body)))], body
+        return asset.respond(accept_encoding, if_none_match, head=method == 'HEAD')
+
+
+class StaticAssetsWSGI(StaticAssets):
+    """WSGI wrapper answering ``/assets/`` itself and passing everything else on."""
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(ASSETS_PREFIX):
+            return self.application(environ, start_response)
+        status, headers, body = self.serve(
+            path, environ.get('REQUEST_METHOD', 'GET'),
+            environ.get('HTTP_ACCEPT_ENCODING', ''), environ.get('HTTP_IF_NONE_MATCH', ''),
+        )
+        start_response(f'{status} {HTTPStatus(status).phrase}', headers)
+        return [body]
+
+
+class StaticAssetsASGI(StaticAssets):
+    """ASGI wrapper answering ``/assets/`` itself and passing everything else on."""
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(ASSETS_PREFIX):
+            return await self.application(scope, receive, send)
+        request_headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        status, headers, body = self.serve(
+            scope['path'], scope['method'],
+            request_headers.get('accept-encoding', ''), request_headers.get('if-none-match', ''),
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+@functools.cache
+def _index():
+    """``(body, etag)`` of the built index.html, or ``(None, None)`` without a frontend build."""
+    path = settings.FRONTEND_DIST_DIR / 'index.html'
+    if not path.is_file():
+        return None, None
+    body = path.read_bytes()
+    return body, f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+@require_safe
+@etag(lambda request: _index()[1])
+def spa_index(request):
+    body, _ = _index()
+    if body is None:
+        return HttpResponseNotFound('Frontend build not found; run "npm run build".')
+    response = HttpResponse(body, content_type='text/html; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    return response
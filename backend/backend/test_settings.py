@@ -0,0 +1,36 @@
+"""Settings for running the test suite locally, without the hosted database.
+
+    python manage.py test accounts --settings=backend.test_settings
+
+Uses SQLite by default; set TEST_DB=postgres to run against a local PostgreSQL
+configured through the usual PGDATABASE/PGUSER/PGPASSWORD/PGHOST/PGPORT variables.
+"""
+import os
+
+# The databases are configured below; this only satisfies the check in settings.py
+os.environ.setdefault("DATABASE_URL", "sqlite:///db.sqlite3")
+
+from .settings import *  # noqa: E402,F403,F401
+from .settings import BASE_DIR  # noqa: E402
+
+if os.environ.get("TEST_DB") == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("PGDATABASE", "dailyforge"),
+            "USER": os.environ.get("PGUSER", "postgres"),
+            "PASSWORD": os.environ.get("PGPASSWORD", ""),
+            "HOST": os.environ.get("PGHOST", "localhost"),
+            "PORT": os.environ.get("PGPORT", "5432"),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "test_db.sqlite3",
+        }
+    }
+
+# Hashing passwords with the production hasher dominates the auth route timings
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -1,18 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from django.views.generic import TemplateView
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
-import os
+
+from .static_assets import spa_index
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("accounts.urls")),
-    # Serve React assets
-    re_path(r'^assets/(?P<path>.*)$', serve, {'document_root': os.path.join(settings.BASE_DIR, '..', 'dist', 'assets')}),
+    # React assets (/assets/) are served in wsgi.py/asgi.py, before Django (see static_assets.py)
     # Serve React app for all other routes
-    re_path(r'^.*$', TemplateView.as_view(template_name='index.html'), name='react_app'),
+    re_path(r'^.*$', spa_index, name='react_app'),
 ]
 
 # Serve static files in development
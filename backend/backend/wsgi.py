@@ -16,3 +16,8 @@ os.environ.setdefault(
 )
 
 application = get_wsgi_application()
+
+from backend.static_assets import StaticAssetsWSGI  # noqa: E402
+
+# Answer /assets/ from memory before Django runs
+application = StaticAssetsWSGI(application)
@@ -1,8 +1,11 @@
-import psycopg2
-
-conn = psycopg2.connect(dbname='mydb', user='postgres', password='1234567890', host='localhost')
-cur = conn.cursor()
-cur.execute("SELECT tablename FROM pg_tables WHERE schemaname='public';")
-tables = cur.fetchall()
-print("Tables in database:", tables)
-conn.close()
+"""List the tables of the database configured by DATABASE_URL (see backend/settings.py)."""
+import os
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+print("Tables in database:", connection.introspection.table_names())
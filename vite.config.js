@@ -1,9 +1,36 @@
+import { readdirSync, readFileSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 
+// Writes a .br and a .gz copy next to every compressible asset of the build, so the backend
+// (backend/backend/static_assets.py) never compresses at request time
+function precompress({ threshold = 1024 } = {}) {
+  let assetsDir
+  return {
+    name: 'precompress',
+    apply: 'build',
+    configResolved(config) {
+      assetsDir = join(config.root, config.build.outDir, config.build.assetsDir)
+    },
+    closeBundle() {
+      for (const name of readdirSync(assetsDir)) {
+        if (!/\.(js|mjs|css|html|svg|json|txt|map|wasm)$/.test(name)) continue
+        const source = readFileSync(join(assetsDir, name))
+        if (source.length < threshold) continue
+        writeFileSync(join(assetsDir, `${name}.br`), brotliCompressSync(source, {
+          params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+        }))
+        writeFileSync(join(assetsDir, `${name}.gz`), gzipSync(source, { level: 9 }))
+      }
+    },
+  }
+}
+
 // https://vitejs.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompress()],
   server: {
     proxy: {
       '/api': {
@@ -13,4 +40,4 @@ export default defineConfig({
       }
     }
   }
-})
\ No newline at end of file
+})